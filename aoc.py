@@ -1,16 +1,20 @@
 from argparse import ArgumentParser, ArgumentTypeError, SUPPRESS
 import cProfile
 from collections.abc import Callable
-from contextlib import redirect_stdout
+from contextlib import nullcontext, redirect_stdout
 from importlib import import_module
 import os
 from pathlib import Path
+import sys
 from time import perf_counter_ns
 import timeit
 from traceback import print_exc
 from typing import Any, SupportsIndex, Type, cast
 
-from solutions.base import AocException, BaseSolution
+from solutions.base import (
+    AocException, BaseSolution, DEFAULT_TRACE_SIZE, StreamingSolution,
+)
+from solutions.utils.pathfinding import SearchStats, collect_search_stats
 
 
 def nanoseconds_str(ns: float) -> str:
@@ -91,10 +95,33 @@ PARSER.add_argument(
     ),
     action="store_true",
 )
+PARSER.add_argument(
+    "--stdin", help=(
+        "read input from standard input instead of the day's input file(s)"
+    ),
+    action="store_true",
+)
 PARSER.add_argument(
     "--debug", help="print debug statements",
     action="store_true",
 )
+PARSER.add_argument(
+    "--trace", help=(
+        "record events passed to self.trace() and print the most recent "
+        f"ones after running (default {DEFAULT_TRACE_SIZE}; if left out, "
+        "nothing is traced)"
+    ),
+    metavar="EVENTS",
+    nargs="?",
+    type=int, default=SUPPRESS,
+)
+PARSER.add_argument(
+    "--search-stats", help=(
+        "print stats about each pathfinding search run by the solution "
+        "(not collected while benchmarking, or in worker processes)"
+    ),
+    action="store_true",
+)
 PARSER.add_argument(
     "-b", "--benchmark", help=(
         "times to run solution for benchmarking (default 100; if left "
@@ -110,6 +137,21 @@ PARSER.add_argument(
     ),
     action="store_true",
 )
+PARSER.add_argument(
+    "-j", "--jobs", help=(
+        "number of workers used by self.parallel_map() (default: 1, "
+        "which runs everything serially)"
+    ),
+    metavar="N",
+    type=ranged_int(1, sys.maxsize), default=1,
+)
+PARSER.add_argument(
+    "--parallel-parts", help=(
+        "run both parts at the same time in separate processes, if the "
+        "solution marks them as independent"
+    ),
+    action="store_true",
+)
 PARSER.add_argument(
     "-p", "--profile", help="profile solution",
     action="store_true",
@@ -123,6 +165,11 @@ def main(
         debug: bool,
         test: bool,
         benchmark: int,
+        trace: int = 0,
+        jobs: int = 1,
+        parallel_parts: bool = False,
+        stdin: bool = False,
+        search_stats: bool = False,
 ):
     # Import solution module
     try:
@@ -148,13 +195,21 @@ def main(
         run_if_slow=slow,
         testing=test,
         debugging=debug,
+        tracing=trace > 0,
+        trace_size=max(trace, 1),
+        jobs=jobs,
+        parallel_parts=parallel_parts,
     )
 
     # Find input file / test files
     assert solution_module.__file__ is not None
     solution_path = Path(solution_module.__file__).parent
     INPUT_FILE = "input.txt"
-    if test:
+    files: list[Path | None]
+    if stdin:
+        # NOTE None represents standard input.
+        files = [None]
+    elif test:
         files = [
             file
             for file in solution_path.iterdir()
@@ -169,21 +224,69 @@ def main(
     for i, file in enumerate(files):
         if i > 0:
             print()
-        print(f"# {file.relative_to(solution_path.parent.parent)}")
+        if file is None:
+            print("# <stdin>")
+        else:
+            print(f"# {file.relative_to(solution_path.parent.parent)}")
         print()
-        solution.read_input_file(file)
 
+        # NOTE Streaming solutions process their input one line at a
+        # time, so (unless benchmarking) it doesn't need to be read all
+        # at once.
+        streaming = isinstance(solution, StreamingSolution) and benchmark <= 0
+        if not streaming:
+            if file is None:
+                solution.read_input_str(sys.stdin.read())
+            else:
+                solution.read_input_file(file)
+        solution.clear_trace()
+
+        all_search_stats: list[SearchStats] = []
         if benchmark > 0:
             benchmark_solution(solution, benchmark)
             print()
-            continue
+        else:
+            try:
+                with (
+                    collect_search_stats() if search_stats
+                    else nullcontext(all_search_stats)
+                ) as all_search_stats:
+                    if streaming:
+                        with (
+                            nullcontext(sys.stdin) if file is None
+                            else open(file)
+                        ) as f:
+                            solution.run_and_print_stream(f)
+                    else:
+                        solution.run_and_print_solutions()
+            except AocException:
+                raise
+            except Exception:
+                print_exc()
 
-        try:
-            solution.run_and_print_solutions()
-        except AocException:
-            raise
-        except Exception:
-            print_exc()
+        if solution.tracing:
+            if benchmark <= 0:
+                print()
+            solution.print_trace()
+        if search_stats and benchmark <= 0:
+            print()
+            print_search_stats(all_search_stats)
+
+    solution.shutdown_workers()
+
+
+def print_search_stats(all_search_stats: list[SearchStats]):
+    print("## Search stats")
+    if not all_search_stats:
+        print("No searches were run.")
+    for i, stats in enumerate(all_search_stats, start=1):
+        print(f"### Search {i}: {stats.search}")
+        print(f"-    States expanded: {stats.states_expanded}")
+        print(f"-      Edges relaxed: {stats.edges_relaxed}")
+        print(f"- Stale pops skipped: {stats.stale_pops}")
+        print(f"-    Peak queue size: {stats.peak_queue_size}")
+        print(f"-  Peak predecessors: {stats.peak_predecessors}")
+        print(f"-          Wall time: {nanoseconds_str(stats.wall_time_ns)}")
 
 
 def benchmark_solution(solution: BaseSolution[Any], benchmark: int):
@@ -213,11 +316,28 @@ def benchmark_solution(solution: BaseSolution[Any], benchmark: int):
         for func in getattr(solution, "_cached_functions", [])
         if (clear_cache_func := getattr(func, "cache_clear", None))
     ]
-    if clear_cache_functions:
+    # NOTE Results of shared stages are also cleared before every run,
+    # so that each run includes the time taken to compute them. Their
+    # times are totaled so they can be reported separately.
+    shared_stages = [
+        name
+        for name in dir(type(solution))
+        if getattr(getattr(type(solution), name), "_shared", False)
+    ]
+    stage_times: dict[str, int] = dict.fromkeys(shared_stages, 0)
+    # NOTE Worker processes have their own caches, which can't be
+    # cleared from here; instead, the workers are shut down before every
+    # run, so that each run starts a fresh pool.
+    if clear_cache_functions or shared_stages or solution.jobs > 1:
         def run_solution_with_clear_cache():
             for func in clear_cache_functions:
                 func()
-            return solution.solve()
+            solution.clear_shared()
+            solution.shutdown_workers()
+            result = solution.solve()
+            for name, stage_time in solution.stage_times.items():
+                stage_times[name] += stage_time
+            return result
         run_solution = run_solution_with_clear_cache
 
     # Time solution function
@@ -249,14 +369,29 @@ def benchmark_solution(solution: BaseSolution[Any], benchmark: int):
     print(f"{what} {benchmark} time{"" if benchmark == 1 else "s"}.")
     print(f"-   Total: {nanoseconds_str(solution_time)}")
     print(f"- Per run: {nanoseconds_str(solution_time / benchmark)}")
+    for name, stage_time in stage_times.items():
+        print(
+            f"- Shared stage {name}: "
+            f"{nanoseconds_str(stage_time / benchmark)} per run"
+        )
 
 
 if __name__ == "__main__":
     ARGS = PARSER.parse_args()
 
+    # Determine the size of the trace buffer
+    if not hasattr(ARGS, "trace"):
+        trace = 0
+    elif ARGS.trace is None:
+        trace = DEFAULT_TRACE_SIZE
+    else:
+        trace = ARGS.trace
+
     if ARGS.profile:
         cProfile.run(
-            "main(ARGS.year, ARGS.day, ARGS.slow, ARGS.debug, ARGS.test, 0)",
+            "main(ARGS.year, ARGS.day, ARGS.slow, ARGS.debug, ARGS.test, 0, "
+            "trace, ARGS.jobs, ARGS.parallel_parts, ARGS.stdin, "
+            "ARGS.search_stats)",
             sort="tottime",
         )
     else:
@@ -268,4 +403,8 @@ if __name__ == "__main__":
         else:
             benchmark = ARGS.benchmark
 
-        main(ARGS.year, ARGS.day, ARGS.slow, ARGS.debug, ARGS.test, benchmark)
+        main(
+            ARGS.year, ARGS.day, ARGS.slow, ARGS.debug, ARGS.test, benchmark,
+            trace, ARGS.jobs, ARGS.parallel_parts, ARGS.stdin,
+            ARGS.search_stats,
+        )
@@ -43,8 +43,8 @@ class Solution(StrSplitSolution):
 
     @answer((7173, 291))
     def solve(self) -> tuple[int, int]:
-        grid = parse_grid(self.input, ignore_chars=".")
-        start = next(k for k, v in grid.items() if v == "S")
+        grid, index = parse_grid(self.input, ignore_chars=".", index=True)
+        start = index.first("S")
 
         points = [start]
         current = get_moves_from_start(grid, start)[0]
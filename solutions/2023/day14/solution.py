@@ -1,8 +1,10 @@
 # https://adventofcode.com/2023/day/14
 
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Hashable, Sequence
+from typing import Any
 
 from ...base import StrSplitSolution, answer
+from ...utils.grids import HAS_NUMPY, Direction, array_tilt, to_array
 
 
 type Rows = tuple[Sequence[str], ...]
@@ -50,6 +52,29 @@ def get_total_load(grid: Rows) -> int:
     return sum((len(grid) - i) * row.count("O") for i, row in enumerate(grid))
 
 
+def state_after_cycles[T](
+        state: T,
+        spin: Callable[[T], T],
+        key: Callable[[T], Hashable],
+        num_cycles: int,
+) -> T:
+    states: dict[Hashable, tuple[int, T]] = {}
+    for i in range(num_cycles):
+        # If a loop was detected, skip to ending state
+        if (seen := states.get(key(state))) is not None:
+            loop_start = seen[0]
+            remaining = num_cycles - loop_start
+            loop_length = i - loop_start
+            end_i = loop_start + remaining % loop_length
+            return next(s for j, s in states.values() if j == end_i)
+        # Save this state
+        states[key(state)] = i, state
+
+        state = spin(state)
+
+    return state
+
+
 class Solution(StrSplitSolution):
     """
     Solution for Advent of Code 2023 Day 14.
@@ -64,24 +89,42 @@ class Solution(StrSplitSolution):
 
     @answer(105008)
     def part_2(self) -> int:
-        grid = tuple(self.input)
         NUM_CYCLES = 1_000_000_000
 
-        states: dict[tuple[str, ...], int] = {}
-        for i in range(NUM_CYCLES):
-            # If a loop was detected, skip to ending state and break
-            if (loop_start := states.get(grid)) is not None:
-                remaining = NUM_CYCLES - loop_start
-                loop_length = i - loop_start
-                end_i = loop_start + remaining % loop_length
-                grid = next(k for k, v in states.items() if v == end_i)
-                break
-            # Save this state
-            states[grid] = i
-
+        # NOTE If NumPy is available, each tilt moves every rock at once.
+        if HAS_NUMPY:
+            walls = to_array(self.input, "#")
+
+            def spin_array(rocks: Any) -> Any:
+                for direction in (
+                    Direction.UP, Direction.LEFT,
+                    Direction.DOWN, Direction.RIGHT,
+                ):
+                    rocks = array_tilt(rocks, walls, direction)
+                return rocks
+
+            rocks = state_after_cycles(
+                to_array(self.input, "O"),
+                spin_array,
+                key=lambda rocks: rocks.tobytes(),
+                num_cycles=NUM_CYCLES,
+            )
+            return sum(
+                (len(rocks) - i) * int(row.sum())
+                for i, row in enumerate(rocks)
+            )
+
+        def spin(grid: Grid) -> Grid:
             grid = roll_up(grid)
             grid = roll_left(grid)
             grid = roll_down(grid)
             grid = roll_right(grid)
+            return grid
 
+        grid = state_after_cycles(
+            tuple(self.input),
+            spin,
+            key=lambda grid: grid,
+            num_cycles=NUM_CYCLES,
+        )
         return get_total_load(grid)
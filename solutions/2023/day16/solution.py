@@ -2,8 +2,9 @@
 
 from functools import cache
 
-from ...base import StrSplitSolution, answer
+from ...base import StrSplitSolution, answer, shared
 from ...utils.grids import Grid, Direction, Position, parse_grid
+from ...utils.pathfinding import reachability_from_all
 
 
 class Beam(Position):
@@ -37,6 +38,14 @@ class Beam(Position):
                 )
 
 
+def next_beams_in(grid: Grid[str], beam: Beam) -> list[Beam]:
+    return [
+        next_beam
+        for next_beam in beam.next_beams(grid[beam.point])
+        if next_beam.point in grid
+    ]
+
+
 class Solution(StrSplitSolution):
     """
     Solution for Advent of Code 2023 Day 16.
@@ -46,7 +55,12 @@ class Solution(StrSplitSolution):
 
     _cached_functions = (Beam.next_beams,)
 
-    def _solve(self, grid: Grid[str], start: Beam) -> int:
+    @shared
+    def _grid(self) -> Grid[str]:
+        return parse_grid(self.input)
+
+    def _solve(self, start: Beam) -> int:
+        grid = self._grid()
         seen: set[Beam] = set()
         beams: list[Beam] = [start]
         while beams:
@@ -54,45 +68,45 @@ class Solution(StrSplitSolution):
             if current_beam in seen:
                 continue
             seen.add(current_beam)
-
-            for next_beam in current_beam.next_beams(grid[current_beam.point]):
-                if next_beam.point in grid:
-                    beams.append(next_beam)
+            beams.extend(next_beams_in(grid, current_beam))
 
         # Count unique energized tiles
         return len({beam.point for beam in seen})
 
     @answer(7067)
     def part_1(self) -> int:
-        grid = parse_grid(self.input)
         # At top-left corner, facing right
-        return self._solve(grid, Beam((0, 0), Direction.RIGHT))
+        return self._solve(Beam((0, 0), Direction.RIGHT))
 
     @answer(7324)
     def part_2(self) -> int:
+        grid = self._grid()
         grid_height = len(self.input)
         grid_width = len(self.input[0])
-        grid = parse_grid(self.input)
 
-        return max(
+        starts = [
             # At top, facing down
-            *(
-                self._solve(grid, Beam((0, col), Direction.DOWN))
-                for col in range(grid_width)
-            ),
+            *(Beam((0, col), Direction.DOWN) for col in range(grid_width)),
             # At right, facing left
             *(
-                self._solve(grid, Beam((row, grid_width - 1), Direction.LEFT))
+                Beam((row, grid_width - 1), Direction.LEFT)
                 for row in range(grid_height)
             ),
             # At bottom, facing up
             *(
-                self._solve(grid, Beam((grid_height - 1, col), Direction.UP))
+                Beam((grid_height - 1, col), Direction.UP)
                 for col in range(grid_width)
             ),
             # At left, facing right
-            *(
-                self._solve(grid, Beam((row, 0), Direction.RIGHT))
-                for row in range(grid_height)
-            ),
+            *(Beam((row, 0), Direction.RIGHT) for row in range(grid_height)),
+        ]
+        # NOTE The beams from different starts run into each other a lot,
+        # so instead of following each starting beam separately, the
+        # whole beam graph is explored once, and the tiles energized from
+        # each start are combined from the parts of the graph it leads to.
+        reachability = reachability_from_all(
+            starts,
+            lambda beam: next_beams_in(grid, beam),
+            get_node=lambda beam: beam.point,
         )
+        return max(reachability.count_from(start) for start in starts)
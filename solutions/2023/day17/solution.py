@@ -1,21 +1,10 @@
 # https://adventofcode.com/2023/day/17
 
 from collections.abc import Iterator
-from typing import NamedTuple
 
 from ...base import StrSplitSolution, answer, slow
-from ...utils.grids import Direction, GridPoint, Position, parse_grid
-from ...utils.pathfinding import find_shortest_paths, taxicab_distance
-
-
-class State(NamedTuple):
-    pos: Position
-    steps: int
-
-    # NOTE find_shortest_paths needs a state with a node property.
-    @property
-    def node(self) -> GridPoint:
-        return self.pos.point
+from ...utils.grids import Direction, PositionEncoding, parse_grid
+from ...utils.pathfinding import find_shortest_paths_indexed
 
 
 class Solution(StrSplitSolution):
@@ -25,47 +14,75 @@ class Solution(StrSplitSolution):
     _year = 2023
     _day = 17
 
+    independent_parts = True
+
     def _solve(self, min_steps: int, max_steps: int) -> int:
-        grid = parse_grid(self.input, int)
-        start_node = 0, 0
-        end_node = len(self.input) - 1, len(self.input[-1]) - 1
+        grid = parse_grid(self.input, int, dense=True)
+        width, height = grid.width, grid.height
+        encoding = PositionEncoding(width, height)
+        end_cell = width * height - 1
 
-        def is_valid_state(s: State) -> bool:
-            # - Position must be in grid
-            # - End cannot be reached before minimum steps are taken
-            return s.pos.point in grid and (
-                s.steps >= min_steps or s.node != end_node
-            )
+        # NOTE Each state is an encoded position and the number of steps
+        # taken in a straight line, packed into one int.
+        num_step_counts = max_steps + 1
+        num_states = len(encoding) * num_step_counts
+        heat_losses = [
+            heat_loss * num_states for heat_loss in grid.cells
+        ]
+        step_table = encoding.step_table
+        turn_tables = encoding.cw_table, encoding.ccw_table
+        # NOTE The taxicab distance from each cell to the end is an
+        # admissible heuristic, as every cell has a heat loss of at
+        # least 1.
+        cell_heuristics = [
+            (height - 1 - row) + (width - 1 - col)
+            for row in range(height)
+            for col in range(width)
+        ]
 
-        def get_transitions(s: State) -> Iterator[tuple[State, int]]:
-            if s.node != start_node and s.steps >= min_steps:
-                # Turn left (and reset number of steps)
-                next_pos = s.pos.rotate("CCW").step()
-                next_state = State(next_pos, steps=1)
-                if is_valid_state(next_state):
-                    yield next_state, grid[next_pos.point]
+        def is_end(s: int) -> bool:
+            position, steps = divmod(s, num_step_counts)
+            return position >> 2 == end_cell and steps >= min_steps
 
-                # Turn right (and reset number of steps)
-                next_pos = s.pos.rotate("CW").step()
-                next_state = State(next_pos, steps=1)
-                if is_valid_state(next_state):
-                    yield next_state, grid[next_pos.point]
+        def get_transitions(s: int) -> Iterator[int]:
+            position, steps = divmod(s, num_step_counts)
+            # NOTE Only the starting states have taken 0 steps, and they
+            # can't turn.
+            if steps and steps >= min_steps:
+                # Turn left or right (and reset number of steps)
+                for turn_table in turn_tables:
+                    next_position = step_table[turn_table[position]]
+                    if next_position < 0:
+                        continue
+                    yield (
+                        heat_losses[next_position >> 2]
+                        + next_position * num_step_counts + 1
+                    )
 
-            if s.steps < max_steps:
+            if steps < max_steps:
                 # Move forward (and increase number of steps)
-                next_pos = s.pos.step()
-                next_state = State(next_pos, steps=s.steps + 1)
-                if is_valid_state(next_state):
-                    yield next_state, grid[next_pos.point]
+                next_position = step_table[position]
+                if next_position >= 0:
+                    yield (
+                        heat_losses[next_position >> 2]
+                        + next_position * num_step_counts + steps + 1
+                    )
+
+        def heuristic(s: int) -> int:
+            return cell_heuristics[s // num_step_counts >> 2]
 
-        path_result = find_shortest_paths(
-            start_states=[
-                State(Position(start_node, Direction.RIGHT), steps=0),
-                State(Position(start_node, Direction.DOWN), steps=0),
+        path_result = find_shortest_paths_indexed(
+            num_states,
+            [
+                encoding.pack(((0, 0), Direction.RIGHT)) * num_step_counts,
+                encoding.pack(((0, 0), Direction.DOWN)) * num_step_counts,
             ],
-            end_node=end_node,
+            is_end,
             get_transitions=get_transitions,
-            heuristic=taxicab_distance,
+            heuristic=heuristic,
+            # NOTE Heat losses are from 1 to 9 and the heuristic is
+            # consistent, so a bucket queue can be used.
+            queue="bucket",
         )
         return path_result.distance
 
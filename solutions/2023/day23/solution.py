@@ -1,11 +1,12 @@
 # https://adventofcode.com/2023/day/23
 
-from collections import defaultdict
+from collections import deque
 
-from ...base import StrSplitSolution, answer, slow
+from ...base import StrSplitSolution, answer
 from ...utils.grids import (
     Direction, Grid, GridPoint, add_points, neighbors, parse_grid,
 )
+from ...utils.pathfinding import compress_graph, longest_simple_path
 
 
 SLOPES = {
@@ -42,69 +43,44 @@ def create_graph(
         with_slopes: bool,
 ) -> Graph:
     # Gather all "intersections" (including the start and end nodes)
-    intersections = {start, end} | {
-        point
-        for point in grid
-        if len(get_moves_from(grid, point, with_slopes)) > 2
-    }
-
-    graph: Graph = defaultdict(dict)
-    for intersection in intersections:
-        for initial_move in get_moves_from(grid, intersection, with_slopes):
-            if initial_move not in grid:
-                continue
-
-            # Start at this intersection; move in the initial direction
-            previous, current = intersection, initial_move
-            distance = 1
-            while current not in intersections:
-                # Get moves from here without doubling back
-                moves = [
-                    m
-                    for m in get_moves_from(grid, current, with_slopes)
-                    if m != previous
-                ]
-                # If there are no moves, we've hit a dead end
-                if not moves:
-                    break
-                # NOTE The paths between intersections should be long
-                # "hallways" with one path forward.
-                assert len(moves) == 1, f"unexpected intersection at {current}"
-
-                previous, current = current, moves[0]
-                distance += 1
-            else:
-                # If we haven't hit a dead end, record the distance
-                graph[intersection][current] = distance
-
-    return graph
-
-
-def find_longest_path(
-        graph: Graph,
-        start: GridPoint,
-        end: GridPoint,
-) -> int:
-    max_distance = 0
-    seen: set[GridPoint] = set()
-
-    # NOTE This is a naive depth-first search. In Part 1, the graph is a
-    # DAG, so there is a better longest-path algorithm; for Part 2,
-    # however, there is no asymptotically better algorithm than this.
-    def search(node: GridPoint, distance: int):
-        nonlocal max_distance
-        if node == end:
-            max_distance = max(max_distance, distance)
-            return
-
-        seen.add(node)
-        for neighbor, distance_to_neighbor in graph[node].items():
-            if neighbor not in seen:
-                search(neighbor, distance + distance_to_neighbor)
-        seen.remove(node)
-
-    search(start, 0)
-    return max_distance
+    def is_intersection(point: GridPoint) -> bool:
+        return point in (start, end) or (
+            len(get_moves_from(grid, point, with_slopes)) > 2
+        )
+
+    # NOTE The paths between intersections are long "hallways" with one
+    # path forward, so they can be compressed into single edges.
+    return compress_graph(
+        grid,
+        lambda point: get_moves_from(grid, point, with_slopes),
+        is_junction=is_intersection,
+        merge_parallel=max,
+    )
+
+
+def direct_perimeter(graph: Graph, end: GridPoint):
+    # NOTE The intersections form a grid, and the ones on its outer edge
+    # have fewer than 4 neighbors. A path that moves along the outer
+    # edge away from the end can never reach the end; the path so far
+    # and the outer edge behind it wall it in. So each edge between two
+    # of those intersections only needs to be taken towards the end.
+    steps_to_end = {end: 0}
+    queue = deque([end])
+    while queue:
+        point = queue.popleft()
+        for next_point in graph[point]:
+            if next_point not in steps_to_end:
+                steps_to_end[next_point] = steps_to_end[point] + 1
+                queue.append(next_point)
+
+    perimeter = {point for point, edges in graph.items() if len(edges) < 4}
+    for point in perimeter:
+        for next_point in list(graph[point]):
+            if (
+                next_point in perimeter
+                and steps_to_end[next_point] > steps_to_end[point]
+            ):
+                del graph[point][next_point]
 
 
 class Solution(StrSplitSolution):
@@ -114,18 +90,30 @@ class Solution(StrSplitSolution):
     _year = 2023
     _day = 23
 
+    independent_parts = True
+
     def _solve(self, with_slopes: bool) -> int:
         grid = parse_grid(self.input, ignore_chars="#")
         start, end = min(grid.keys()), max(grid.keys())
 
         graph = create_graph(grid, start, end, with_slopes=with_slopes)
-        return find_longest_path(graph, start, end)
+        if not with_slopes:
+            direct_perimeter(graph, end)
+        # NOTE In Part 1, the graph is a DAG, so there is a better
+        # longest-path algorithm; for Part 2, however, there is no
+        # asymptotically better algorithm than an exhaustive search.
+        return longest_simple_path(
+            graph, start, end,
+            # NOTE If there are multiple workers, the search is split
+            # between them, after the first few steps.
+            split_depth=4 if self.jobs > 1 else 0,
+            map_func=self.parallel_map,
+        )
 
     @answer(1930)
     def part_1(self) -> int:
         return self._solve(with_slopes=True)
 
     @answer(6230)
-    @slow
     def part_2(self) -> int:
         return self._solve(with_slopes=False)
@@ -1,7 +1,7 @@
 # https://adventofcode.com/2024/day/4
 
 from ...base import StrSplitSolution, answer
-from ...utils.grids import add_points, offsets, parse_grid, subtract_points
+from ...utils.grids import offsets, parse_grid
 
 
 class Solution(StrSplitSolution):
@@ -13,43 +13,55 @@ class Solution(StrSplitSolution):
 
     @answer(2662)
     def part_1(self) -> int:
-        grid = parse_grid(self.input)
+        grid = parse_grid(self.input, dense=True)
+        cells, width = grid.cells, grid.width
 
         total = 0
         # Find all start characters of an XMAS
-        for start, start_char in grid.items():
-            if start_char != "X":
+        for start, start_char in enumerate(cells):
+            if start_char != ord("X"):
                 continue
+            row, col = grid.point(start)
 
             # Scan for the rest of the characters in all directions
-            for offset in offsets(num_directions=8):
-                point = start
-                for char in "MAS":
-                    point = add_points(point, offset)
-                    if grid.get(point) != char:
-                        break
-                else:
+            for offset_r, offset_c in offsets(num_directions=8):
+                # Skip directions where the XMAS wouldn't fit
+                end = row + 3 * offset_r, col + 3 * offset_c
+                if not grid.in_bounds(end):
+                    continue
+                # NOTE Moving by one cell in this direction changes the
+                # cell index by this amount.
+                step = offset_r * width + offset_c
+                if all(
+                    cells[start + i * step] == char
+                    for i, char in enumerate(b"MAS", start=1)
+                ):
                     total += 1
 
         return total
 
     @answer(2034)
     def part_2(self) -> int:
-        grid = parse_grid(self.input)
+        grid = parse_grid(self.input, dense=True)
+        cells, width = grid.cells, grid.width
 
         total = 0
         # Find all center characters of an X-shaped MAS
-        for center, center_char in grid.items():
-            if center_char != "A":
+        for center, center_char in enumerate(cells):
+            if center_char != ord("A"):
+                continue
+            # Skip centers on the edge of the grid
+            row, col = grid.point(center)
+            if not (0 < row < grid.height - 1 and 0 < col < width - 1):
                 continue
 
             num_mas = 0
             # Scan for M and S in diagonal directions
-            for offset in offsets(num_directions=4, diagonals=True):
-                forward = add_points(center, offset)
-                backward = subtract_points(center, offset)
+            for offset_r, offset_c in offsets(4, diagonals=True):
+                step = offset_r * width + offset_c
+                forward, backward = cells[center + step], cells[center - step]
                 # MAS has M and S in opposite directions from the A
-                if grid.get(forward) == "M" and grid.get(backward) == "S":
+                if forward == ord("M") and backward == ord("S"):
                     num_mas += 1
 
             # An X-MAS consists of two MASes that cross
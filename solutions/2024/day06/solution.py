@@ -1,28 +1,63 @@
 # https://adventofcode.com/2024/day/6
 
 from ...base import StrSplitSolution, answer, slow
-from ...utils.grids import Grid, Direction, Position, parse_grid
+from ...utils.grids import (
+    DenseGrid, Direction, ObstacleIndex, Position, PositionEncoding,
+    parse_grid, subtract_points,
+)
 
 
-def track_guard(grid: Grid[str], guard: Position) -> list[Position] | None:
+WALL = ord("#")
+
+
+def track_guard(
+        grid: DenseGrid,
+        positions: PositionEncoding,
+        guard: int,
+) -> list[int] | None:
+    # NOTE Positions are encoded as ints, so stepping and rotating are
+    # just table lookups.
+    step, rotate_cw = positions.step_table, positions.cw_table
+    cells = grid.cells
+
     # HACK This dict is being used as an "ordered set", so to speak. It
     # stores the positions in order (with values of None), and we can
     # quickly check whether it contains a certain position.
-    path: dict[Position, None] = {}
+    path: dict[int, None] = {}
 
-    while guard.point in grid:
+    while guard != positions.OFF_GRID:
         if guard in path:
             return None
         path[guard] = None
 
-        if grid.get(guard.next_point) == "#":
-            guard = guard.rotate("CW")
+        next_guard = step[guard]
+        if next_guard != positions.OFF_GRID and cells[next_guard >> 2] == WALL:
+            guard = rotate_cw[guard]
         else:
-            guard = guard.step()
+            guard = next_guard
 
     return list(path)
 
 
+def guard_loops(obstacles: ObstacleIndex, guard: Position) -> bool:
+    # NOTE The guard walks straight until hitting an obstacle, so we can
+    # jump straight to the obstacle instead of walking there. Only the
+    # positions where the guard turns need to be remembered.
+    turns: set[Position] = set()
+    while (
+        obstacle := obstacles.next_blocked(guard.point, guard.facing)
+    ) is not None:
+        guard = Position(
+            point=subtract_points(obstacle, guard.facing.offset),
+            facing=guard.facing,
+        ).rotate("CW")
+        if guard in turns:
+            return True
+        turns.add(guard)
+
+    return False
+
+
 class Solution(StrSplitSolution):
     """
     Solution for Advent of Code 2024 Day 6.
@@ -33,33 +68,41 @@ class Solution(StrSplitSolution):
     @answer((4890, 1995))
     @slow
     def solve(self) -> tuple[int, int]:
-        grid = parse_grid(self.input)
-        guard = Position(
-            point=next(k for k, v in grid.items() if v == "^"),
+        grid = parse_grid(self.input, dense=True)
+        positions = PositionEncoding(grid.width, grid.height)
+        guard = positions.pack(Position(
+            point=grid.point(grid.cells.index(ord("^"))),
             facing=Direction.UP,
-        )
-        path = track_guard(grid, guard)
+        ))
+        path = track_guard(grid, positions, guard)
         assert path is not None
-        points_seen = {p.point for p in path}
+        cells_seen = {state >> 2 for state in path}
+        # NOTE Because the guard's path will be identical up to an
+        # obstacle, we can start the guard directly before it; this is
+        # the first position on the path that steps into each cell.
+        first_step_into: dict[int, int] = {}
+        for state in path:
+            first_step_into.setdefault(positions.step(state) >> 2, state)
 
+        obstacles = ObstacleIndex(
+            grid.point(index)
+            for index, char in enumerate(grid.cells)
+            if char == WALL
+        )
         num_obstacle_placements = 0
-        for obstacle_point in points_seen:
+        for obstacle_cell in cells_seen:
             # An obstacle can only be placed on an empty tile
-            if grid[obstacle_point] != ".":
+            if grid.cells[obstacle_cell] != ord("."):
                 continue
 
             # Try placing an obstacle here
-            grid[obstacle_point] = "#"
-            # NOTE Because the guard's path will be identical up to the
-            # obstacle, we can start the guard directly before it.
-            blocked_guard = next(
-                p for p in path if p.next_point == obstacle_point
-            )
-            blocked_path = track_guard(grid, blocked_guard)
+            obstacle_point = grid.point(obstacle_cell)
+            obstacles.add(obstacle_point)
+            blocked_guard = positions.unpack(first_step_into[obstacle_cell])
             # If the guard got stuck in a loop, tally this placement
-            if blocked_path is None:
+            if guard_loops(obstacles, blocked_guard):
                 num_obstacle_placements += 1
             # Un-place the obstacle
-            grid[obstacle_point] = "."
+            obstacles.remove(obstacle_point)
 
-        return len(points_seen), num_obstacle_placements
+        return len(cells_seen), num_obstacle_placements
@@ -1,20 +1,9 @@
 # https://adventofcode.com/2024/day/8
 
-from collections import defaultdict
 from itertools import permutations
 
 from ...base import StrSplitSolution, answer
-from ...utils.grids import (
-    Grid, GridPoint, add_points, parse_grid, subtract_points,
-)
-
-
-def find_antennas(grid: Grid[str]) -> dict[str, list[GridPoint]]:
-    antennas: dict[str, list[GridPoint]] = defaultdict(list)
-    for point, char in grid.items():
-        if char != ".":
-            antennas[char].append(point)
-    return antennas
+from ...utils.grids import GridPoint, add_points, parse_grid, subtract_points
 
 
 class Solution(StrSplitSolution):
@@ -26,8 +15,12 @@ class Solution(StrSplitSolution):
 
     @answer((400, 1280))
     def solve(self) -> tuple[int, int]:
-        grid = parse_grid(self.input)
-        antennas = find_antennas(grid)
+        grid, index = parse_grid(self.input, index=True)
+        antennas = {
+            char: index.positions_of(char)
+            for char in index.chars()
+            if char != "."
+        }
 
         weak_antinodes: set[GridPoint] = set()
         strong_antinodes: set[GridPoint] = set()
@@ -1,27 +1,10 @@
 # https://adventofcode.com/2024/day/10
 
+from collections.abc import Iterator
+
 from ...base import StrSplitSolution, answer
-from ...utils.grids import neighbors, parse_grid, Grid, GridPoint
-
-
-def get_trailhead_ends(
-        grid: Grid[int],
-        trailhead: GridPoint,
-) -> list[GridPoint]:
-    queue = [trailhead]
-    ends: list[GridPoint] = []
-    while queue:
-        point = queue.pop()
-        # If our point has height 9, it is the end of a trail
-        if (height := grid[point]) == 9:
-            ends.append(point)
-            continue
-        # Continue walking along points that are exactly 1 higher
-        queue.extend(
-            n for n in neighbors(point, num_directions=4)
-            if grid.get(n) == height + 1
-        )
-    return ends
+from ...utils.grids import neighbors, parse_grid, GridPoint
+from ...utils.pathfinding import distance_field
 
 
 class Solution(StrSplitSolution):
@@ -34,14 +17,33 @@ class Solution(StrSplitSolution):
     @answer((611, 1380))
     def solve(self) -> tuple[int, int]:
         grid = parse_grid(self.input, int, ignore_chars=".")
+        trailheads = [point for point, height in grid.items() if height == 0]
+
+        def climb(point: GridPoint) -> Iterator[GridPoint]:
+            # Continue walking along points that are exactly 1 higher
+            height = grid[point]
+            return (
+                n for n in neighbors(point, num_directions=4)
+                if grid.get(n) == height + 1
+            )
+
+        # NOTE Each step climbs by exactly 1, so the distance from a
+        # trailhead to a point is that point's height; the trailhead's
+        # score is the number of points at distance 9.
+        total_scores = sum(
+            distance_field([trailhead], climb).count_at(9)
+            for trailhead in trailheads
+        )
 
-        total_scores, total_ratings = 0, 0
-        for point, height in grid.items():
-            # Only count ends from trailheads, i.e. points with height 0
-            if height != 0:
-                continue
-            ends = get_trailhead_ends(grid, point)
-            total_scores += len(set(ends))
-            total_ratings += len(ends)
+        # NOTE The number of trails from a point is the sum of the
+        # numbers of trails from the points it can climb to, so these
+        # are found from the highest points down.
+        num_trails: dict[GridPoint, int] = {}
+        for point, height in sorted(grid.items(), key=lambda p: -p[1]):
+            if height == 9:
+                num_trails[point] = 1
+            else:
+                num_trails[point] = sum(num_trails[n] for n in climb(point))
+        total_ratings = sum(num_trails[trailhead] for trailhead in trailheads)
 
         return total_scores, total_ratings
@@ -63,20 +63,16 @@ class Solution(StrSplitSolution):
             grid_str = robots_to_grid_str(robots, width, height)
 
             if second == 100:
-                self.debug(
-                    "Robots after 100 seconds:",
-                    grid_str,
-                    trailing_newline=True,
-                )
+                self.trace("Robots after 100 seconds:\n{}", grid_str)
                 part_1 = safety_factor(robots, width, height)
 
             # HACK Because we know the Christmas tree has a solid border
             # around it, we can simply check whether this border exists.
             if "1" * 31 in grid_str:
-                self.debug(
-                    f"Christmas tree found after {second} seconds:",
+                self.trace(
+                    "Christmas tree found after {} seconds:\n{}",
+                    second,
                     grid_str,
-                    trailing_newline=True,
                 )
                 part_2 = second
 
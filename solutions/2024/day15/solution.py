@@ -109,8 +109,8 @@ class Solution(StrSplitSolution):
 
     def _solve(self, raw_grid: list[str], moves: Iterable[str]) -> int:
         num_rows, num_cols = len(raw_grid), len(raw_grid[0])
-        grid = parse_grid(raw_grid, ignore_chars="#")
-        loc = next(k for k, v in grid.items() if v == "@")
+        grid, index = parse_grid(raw_grid, ignore_chars="#", index=True)
+        loc = index.first("@")
 
         for move in moves:
             if self.debugging:
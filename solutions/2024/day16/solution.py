@@ -3,15 +3,8 @@
 from collections.abc import Iterator
 
 from ...base import StrSplitSolution, answer
-from ...utils.grids import parse_grid, GridPoint, Direction, Position
-from ...utils.pathfinding import find_shortest_paths
-
-
-class State(Position):
-    # NOTE find_shortest_paths needs a state with a node property.
-    @property
-    def node(self) -> GridPoint:
-        return self.point
+from ...utils.grids import Direction, PositionEncoding, parse_grid
+from ...utils.pathfinding import find_shortest_paths_indexed
 
 
 class Solution(StrSplitSolution):
@@ -23,27 +16,40 @@ class Solution(StrSplitSolution):
 
     @answer((109496, 551))
     def solve(self) -> tuple[int, int]:
-        grid = parse_grid(self.input, ignore_chars="#")
-        start_node = next(k for k, v in grid.items() if v == "S")
-        end_node = next(k for k, v in grid.items() if v == "E")
+        grid, index = parse_grid(self.input, dense=True, index=True)
+        encoding = PositionEncoding(grid.width, grid.height)
+        num_states = len(encoding)
+        end_cell = grid.index(index.first("E"))
+        is_wall = [cell == ord("#") for cell in grid.cells]
+        step_table, cw_table, ccw_table = (
+            encoding.step_table, encoding.cw_table, encoding.ccw_table,
+        )
+        TURN_COST = 1000 * num_states
+        STEP_COST = 1 * num_states
 
-        def get_transitions(s: State) -> Iterator[tuple[State, int]]:
+        def get_transitions(s: int) -> Iterator[int]:
             # Turn 90 degrees clockwise = 1000 points
-            yield s.rotate("CW"), 1000
+            yield TURN_COST + cw_table[s]
             # Turn 90 degrees counter-clockwise = 1000 points
-            yield s.rotate("CCW"), 1000
+            yield TURN_COST + ccw_table[s]
             # Move forward = 1 point
-            if s.next_point in grid:
-                yield s.step(), 1
-
-        path_result = find_shortest_paths(
-            [State(start_node, Direction.RIGHT)],
-            end_node,
+            next_s = step_table[s]
+            if next_s >= 0 and not is_wall[next_s >> 2]:
+                yield STEP_COST + next_s
+
+        path_result = find_shortest_paths_indexed(
+            num_states,
+            [encoding.pack((index.first("S"), Direction.RIGHT))],
+            lambda s: s >> 2 == end_cell,
             get_transitions=get_transitions,
+            # NOTE With only two distinct costs, there are at most a few
+            # distinct priorities in the queue at once, so a bucket
+            # queue can be used.
+            queue="bucket",
         )
-        all_nodes = set(
-            state.node
-            for path in path_result.paths
-            for state in path
-        )
-        return path_result.distance, len(all_nodes)
+        # NOTE There can be exponentially many best paths, but the cells
+        # on any of them can be found directly from the predecessor DAG.
+        all_cells = {
+            state >> 2 for state in path_result.states_on_shortest_paths()
+        }
+        return path_result.distance, len(all_cells)
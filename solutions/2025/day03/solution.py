@@ -1,6 +1,6 @@
 # https://adventofcode.com/2025/day/3
 
-from ...base import StrSplitSolution, answer
+from ...base import StreamingSolution, answer
 
 
 def max_joltage(bank: str, batteries: int) -> str:
@@ -18,17 +18,21 @@ def max_joltage(bank: str, batteries: int) -> str:
     return first_digit + max_joltage(bank[i + 1 :], batteries - 1)
 
 
-class Solution(StrSplitSolution):
+class Solution(StreamingSolution):
     """
     Solution for Advent of Code 2025 Day 3.
     """
     _year = 2025
     _day = 3
 
-    @answer(17092)
-    def part_1(self) -> int:
-        return sum(int(max_joltage(line, batteries=2)) for line in self.input)
+    def reset(self):
+        self.total_joltage_1 = 0
+        self.total_joltage_2 = 0
 
-    @answer(170147128753455)
-    def part_2(self) -> int:
-        return sum(int(max_joltage(line, batteries=12)) for line in self.input)
+    def feed(self, line: str):
+        self.total_joltage_1 += int(max_joltage(line, batteries=2))
+        self.total_joltage_2 += int(max_joltage(line, batteries=12))
+
+    @answer((17092, 170147128753455))
+    def result(self) -> tuple[int, int]:
+        return self.total_joltage_1, self.total_joltage_2
@@ -1,16 +1,18 @@
 # https://adventofcode.com/2025/day/4
 
 from ...base import StrSplitSolution, answer
-from ...utils.grids import GridPoint, neighbors, parse_grid
+from ...utils.grids import BitGrid
 
 
-def is_accessible(rolls: set[GridPoint], point: GridPoint) -> bool:
-    num_neighbors = sum(
-        1
-        for n in neighbors(point, num_directions=8)
-        if n in rolls
+def accessible_rolls(rolls: BitGrid) -> BitGrid:
+    # NOTE The neighbors of every roll are counted at once; a roll is
+    # accessible if it has fewer than 4 neighbors.
+    num_neighbors = rolls.neighbor_counts(num_directions=8)
+    few_neighbors = (
+        num_neighbors[0] | num_neighbors[1]
+        | num_neighbors[2] | num_neighbors[3]
     )
-    return num_neighbors < 4
+    return rolls & few_neighbors
 
 
 class Solution(StrSplitSolution):
@@ -22,20 +24,16 @@ class Solution(StrSplitSolution):
 
     @answer(1587)
     def part_1(self) -> int:
-        rolls = set(parse_grid(self.input, ignore_chars=".").keys())
-        return sum(is_accessible(rolls, point) for point in rolls)
+        rolls = BitGrid.from_lines(self.input, "@")
+        return len(accessible_rolls(rolls))
 
     @answer(8946)
     def part_2(self) -> int:
-        rolls = set(parse_grid(self.input, ignore_chars=".").keys())
+        rolls = BitGrid.from_lines(self.input, "@")
 
         total = 0
         while True:
-            accessible_points = {
-                point
-                for point in rolls
-                if is_accessible(rolls, point)
-            }
+            accessible_points = accessible_rolls(rolls)
             # Loop until no more rolls are accessible
             if not accessible_points:
                 break
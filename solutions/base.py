@@ -1,10 +1,18 @@
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor,
+)
 from enum import Enum, auto
 from functools import wraps
 import inspect
+from itertools import batched, repeat
 from pprint import pprint
+import sys
+from time import perf_counter_ns
 from typing import (
-    Any, TYPE_CHECKING, TypeVar, cast, final, get_origin, overload,
+    Any, NamedTuple, Self, TYPE_CHECKING, TypeVar, cast, final, get_origin,
+    overload,
 )
 
 if TYPE_CHECKING:
@@ -34,6 +42,31 @@ type InputType = str | int | list[str] | list[int]
 type ResultType = int | str | None
 
 
+DEFAULT_TRACE_SIZE = 1000
+
+
+class TraceEvent(NamedTuple):
+    """
+    Event recorded by `BaseSolution.trace()`.
+
+    Attributes
+    ----------
+    time : int
+        Time the event was recorded, in nanoseconds since the trace was
+        started.
+    part : int or None
+        Part that was running when the event was recorded, if known.
+    count : int
+        Number of events recorded so far (including this one).
+    message : str
+        Message of the event.
+    """
+    time: int
+    part: int | None
+    count: int
+    message: str
+
+
 def print_answer(part: int, answer: ResultType):
     """
     Print a formatted version of the answer.
@@ -51,6 +84,44 @@ def print_answer(part: int, answer: ResultType):
     print(answer)
 
 
+# NOTE Each worker process used by BaseSolution.parallel_map() receives
+# its own copy of the solution (including its input) once, when the
+# worker starts; it is stored here.
+_worker_solution: "BaseSolution[Any] | None" = None
+
+
+def _init_worker(solution: "BaseSolution[Any]"):
+    global _worker_solution
+    _worker_solution = solution
+
+
+def _call_in_worker(
+        func: Callable[..., Any],
+        is_method: bool,
+        item: Any,
+) -> Any:
+    if is_method:
+        return func(_worker_solution, item)
+    return func(item)
+
+
+def _run_part(solution: "BaseSolution[Any]", part: int) -> ResultType:
+    # NOTE A pool started by parallel_map() from inside a part's worker
+    # process can deadlock (its workers are forked from a process that
+    # is itself a pool worker), so each part runs serially instead; the
+    # two parts still run in parallel with each other.
+    solution.jobs = 1
+    solution._current_part = part
+    return solution.part_1() if part == 1 else solution.part_2()
+
+
+def _gil_enabled() -> bool:
+    # NOTE sys._is_gil_enabled() only exists in Python 3.13 and higher;
+    # the GIL is always enabled in earlier versions.
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
 class BaseSolution[I: InputType]:
     separator = "\n"
 
@@ -62,23 +133,53 @@ class BaseSolution[I: InputType]:
     # so that the function that benchmarks them can clear their caches
     # on every run.
     _cached_functions: tuple[Callable[..., Any], ...] | None
+    # NOTE If this is true, part_1() and part_2() do not depend on each
+    # other (or on any state shared between them), so they may be run
+    # at the same time in separate processes.
+    independent_parts: bool = False
 
     def __init__(
             self,
             run_if_slow: bool = False,
             testing: bool = False,
             debugging: bool = False,
+            tracing: bool = False,
+            trace_size: int = DEFAULT_TRACE_SIZE,
+            jobs: int = 1,
+            parallel_parts: bool = False,
     ):
         self.run_if_slow = run_if_slow
         self.testing = testing
         self.debugging = debugging
+        self.tracing = tracing
+        # NOTE Only the most recent trace events are kept.
+        self._trace_events: deque[TraceEvent] = deque(maxlen=trace_size)
+        self._trace_count = 0
+        self._trace_start = perf_counter_ns()
+        self._current_part: int | None = None
+        # NOTE Results of methods marked as @shared are stored here (and
+        # their runtimes in nanoseconds are stored in _stage_times).
+        self._shared_results: dict[str, Any] = {}
+        self._stage_times: dict[str, int] = {}
+        # NOTE The worker pool used by parallel_map() is created when it
+        # is first needed, and reused until new input is read. Workers
+        # are only used if more than one job is asked for.
+        self.jobs = jobs
+        self._executor: Executor | None = None
+        self.parallel_parts = parallel_parts
+
+    def __getstate__(self) -> dict[str, Any]:
+        # NOTE The worker pool can't (and shouldn't) be sent to workers.
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
 
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}<year={self.year}, day={self.day}>("
             + ", ".join(
                 f"{name}={attr!r}"
-                for name in ("run_if_slow", "testing", "debugging")
+                for name in ("run_if_slow", "testing", "debugging", "tracing")
                 if (attr := getattr(self, name))
             )
             + ")"
@@ -108,7 +209,14 @@ class BaseSolution[I: InputType]:
         tuple of (ResultType, ResultType)
             The Part 1 solution and the Part 2 solution.
         """
-        return self.part_1(), self.part_2()
+        try:
+            self._current_part = 1
+            part_1 = self.part_1()
+            self._current_part = 2
+            part_2 = self.part_2()
+        finally:
+            self._current_part = None
+        return part_1, part_2
 
     def part_1(self) -> ResultType:
         """
@@ -178,8 +286,37 @@ class BaseSolution[I: InputType]:
         """
         result = self._read_input_str(st)
         self.input = cast(I, result)
+        # Results of shared stages depend on the input, so they must be
+        # recomputed for the new input
+        self.clear_shared()
+        # Workers have a copy of the old input, so they must be replaced
+        self.shutdown_workers()
         return result
 
+    @final
+    def clear_shared(self):
+        """
+        Clear the stored results of all methods marked as `@shared`.
+
+        The next call to each such method will compute its result again.
+        """
+        self._shared_results.clear()
+        self._stage_times.clear()
+
+    @final
+    @property
+    def stage_times(self) -> dict[str, int]:
+        """
+        Time taken by each `@shared` stage that has been computed, in
+        nanoseconds.
+
+        Returns
+        -------
+        dict of {str : int}
+            Mapping of stage names to their runtimes.
+        """
+        return dict(self._stage_times)
+
     @final
     def _read_input_str(self, st: str) -> InputType:
         data = st.strip("\n")
@@ -197,11 +334,110 @@ class BaseSolution[I: InputType]:
             case _:
                 raise ValueError(f"Unrecognized input type: {self.input_type}")
 
+    @final
+    def parallel_map[T, U](
+            self,
+            func: Callable[[T], U],
+            items: Iterable[T],
+            *,
+            chunksize: int = 1,
+    ) -> list[U]:
+        """
+        Apply a function to every item in an iterable, using multiple
+        workers if possible.
+
+        Workers are processes (or threads, if running on a free-threaded
+        build of Python with the GIL disabled), and are reused between
+        calls until new input is read. Each worker process receives a
+        copy of the solution once, when it starts; if `func` is a method
+        of the solution, it is called on that copy, so it has access to
+        `self.input` and any `@shared` stages computed before the
+        workers started. Otherwise, `func` must be a module-level
+        function.
+
+        If `self.jobs` is 1, the items are processed serially instead.
+        This is always the case when the parts are run in parallel (see
+        `parallel_parts`), as each part is already in its own worker
+        process.
+
+        Parameters
+        ----------
+        func : callable
+            Function (or method of this solution) to apply to each item.
+            Its arguments and results must be picklable.
+        items : iterable
+            Items to apply the function to.
+        chunksize : int, default 1
+            Number of items sent to a worker process at once. Larger
+            values reduce overhead when there are many cheap items.
+
+        Returns
+        -------
+        list
+            Results of applying the function to each item, in order.
+
+        Notes
+        -----
+        Any changes made to the solution by `func` (including recorded
+        trace events) are not visible outside of worker processes.
+        """
+        if self.jobs <= 1:
+            return [func(item) for item in items]
+
+        if self._executor is None:
+            if _gil_enabled():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.jobs,
+                    initializer=_init_worker,
+                    initargs=(self,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.jobs)
+
+        if isinstance(self._executor, ThreadPoolExecutor):
+            return list(self._executor.map(func, items))
+
+        # NOTE Bound methods of this solution would be sent along with
+        # the whole solution for every item; instead, the underlying
+        # function is sent, and the worker's copy of the solution is
+        # used.
+        is_method = getattr(func, "__self__", None) is self
+        if is_method:
+            func = getattr(func, "__func__")
+        return list(self._executor.map(
+            _call_in_worker,
+            repeat(func),
+            repeat(is_method),
+            items,
+            chunksize=chunksize,
+        ))
+
+    @final
+    def shutdown_workers(self):
+        """
+        Shut down the workers used by `parallel_map()`, if any.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
     @final
     def run_and_print_solutions(self):
         print(f"## Solutions for Advent of Code {self.year} Day {self.day}")
 
-        result = self.solve()
+        parts_are_separated = type(self).solve is BaseSolution.solve
+        if (
+            self.parallel_parts
+            and self.independent_parts
+            and parts_are_separated
+        ):
+            result = self._solve_parts_in_parallel()
+        else:
+            result = self.solve()
+        self._print_answers(result)
+
+    @final
+    def _print_answers(self, result: tuple[ResultType, ResultType]):
         try:
             if result:
                 for part, answer in enumerate(result, start=1):
@@ -211,6 +447,28 @@ class BaseSolution[I: InputType]:
                 f"unable to unpack answers from solve(), got {result!r}"
             ) from e
 
+    @final
+    def _solve_parts_in_parallel(self) -> tuple[ResultType, ResultType]:
+        """
+        Return the answers to Parts 1 and 2 of the Advent of Code
+        puzzle, running each part in its own process.
+
+        Returns
+        -------
+        tuple of (ResultType, ResultType)
+            The Part 1 solution and the Part 2 solution.
+        """
+        # NOTE Each process gets its own copy of the solution, so any
+        # changes made to it by either part (including recorded trace
+        # events) are not visible here.
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(_run_part, self, part)
+                for part in (1, 2)
+            ]
+            part_1, part_2 = (future.result() for future in futures)
+        return part_1, part_2
+
     @final
     def debug(
             self,
@@ -243,6 +501,92 @@ class BaseSolution[I: InputType]:
         if trailing_newline:
             print()
 
+    @final
+    def trace(
+            self,
+            message: str | Callable[[], str],
+            *args: Any,
+            **kwargs: Any,
+    ):
+        """
+        Record a trace event.
+
+        If `self.tracing` is false, this returns immediately, without
+        formatting the message or calling anything. Otherwise, the event
+        is stored in a bounded buffer along with a timestamp, the
+        current part, and the number of events recorded so far; only the
+        most recent events are kept.
+
+        Parameters
+        ----------
+        message : str or callable
+            Either a format string (formatted with `args` and `kwargs`
+            using `str.format`), or a callable taking no arguments and
+            returning the message.
+        *args
+            Positional arguments for the format string.
+        **kwargs
+            Keyword arguments for the format string.
+
+        Examples
+        --------
+        >>> self.trace("Reached {} after {} steps", point, steps)
+        >>> self.trace(lambda: grid_to_str(grid))
+        """
+        if not self.tracing:
+            return
+        if callable(message):
+            text = message()
+        elif args or kwargs:
+            text = message.format(*args, **kwargs)
+        else:
+            text = message
+        self._trace_count += 1
+        self._trace_events.append(TraceEvent(
+            time=perf_counter_ns() - self._trace_start,
+            part=self._current_part,
+            count=self._trace_count,
+            message=text,
+        ))
+
+    @final
+    @property
+    def trace_events(self) -> list[TraceEvent]:
+        """
+        Trace events currently in the buffer, from oldest to newest.
+
+        Returns
+        -------
+        list of TraceEvent
+            Recorded trace events.
+        """
+        return list(self._trace_events)
+
+    @final
+    def clear_trace(self):
+        """
+        Clear all recorded trace events, and restart the trace timer.
+        """
+        self._trace_events.clear()
+        self._trace_count = 0
+        self._trace_start = perf_counter_ns()
+
+    @final
+    def print_trace(self):
+        """
+        Print all trace events currently in the buffer.
+        """
+        print("## Trace")
+        num_dropped = self._trace_count - len(self._trace_events)
+        if num_dropped:
+            print(f"({num_dropped} earlier events dropped)")
+        for event in self._trace_events:
+            part = "-" if event.part is None else event.part
+            print(
+                f"[{event.count} @ {event.time / 1e6:.3f} ms, "
+                f"part {part}] {event.message}"
+            )
+
 
 class TextSolution(BaseSolution[str]):
     """
@@ -274,6 +618,175 @@ class IntSplitSolution(BaseSolution[list[int]]):
     input_type = InputTypes.INTSPLIT
 
 
+class StreamingSolution(BaseSolution[list[str]]):
+    """
+    Input is of the type `list[str]`, split by newlines; each line is
+    processed independently.
+
+    Instead of `part_1()` and `part_2()`, subclasses define `reset()` to
+    initialize their state, `feed()` to update it with a single line,
+    and `result()` to return the answers from it. Lines can then be
+    streamed from any iterable (a file, `sys.stdin`, a generator, etc.)
+    without being stored, and more lines can be added later without
+    processing the earlier ones again.
+
+    If `chunk_size` is set and `merge()` is defined, lines are instead
+    processed in chunks of that size using `parallel_map()`, and the
+    states of the chunks are merged in order.
+    """
+    input_type = InputTypes.STRSPLIT
+
+    chunk_size: int | None = None
+
+    def reset(self):
+        """
+        Initialize the state used to compute the answers.
+        """
+        raise NotImplementedError
+
+    def feed(self, line: str):
+        """
+        Update the state with a single line of input.
+
+        Parameters
+        ----------
+        line : str
+            Line of input (without a trailing newline).
+        """
+        raise NotImplementedError
+
+    def result(self) -> tuple[ResultType, ResultType]:
+        """
+        Return the answers to Parts 1 and 2 of the Advent of Code
+        puzzle, using the lines fed so far.
+
+        Returns
+        -------
+        tuple of (ResultType, ResultType)
+            The Part 1 solution and the Part 2 solution.
+        """
+        raise NotImplementedError
+
+    def merge(self, other: Self):
+        """
+        Update the state with the state of another solution, which was
+        fed the lines directly after the ones fed to this solution.
+
+        Define this only if lines can be processed in separate chunks.
+
+        Parameters
+        ----------
+        other : StreamingSolution
+            Solution fed the next chunk of lines.
+        """
+        raise NotImplementedError
+
+    @final
+    def solve(self) -> tuple[ResultType, ResultType]:
+        return self.answer_stream(self.input)
+
+    @final
+    def answer_stream(
+            self,
+            lines: Iterable[str],
+    ) -> tuple[ResultType, ResultType]:
+        """
+        Return the answers to Parts 1 and 2 of the Advent of Code
+        puzzle, using lines from an iterable.
+
+        Trailing newlines are removed from each line, and blank lines at
+        the start and end of the input are ignored.
+
+        Parameters
+        ----------
+        lines : iterable of str
+            Lines of input.
+
+        Returns
+        -------
+        tuple of (ResultType, ResultType)
+            The Part 1 solution and the Part 2 solution.
+        """
+        self.reset()
+        lines = _strip_blank_lines(lines)
+        if (
+            self.chunk_size is None
+            or type(self).merge is StreamingSolution.merge
+        ):
+            for line in lines:
+                self.feed(line)
+        else:
+            for chunk_state in self.parallel_map(
+                self._feed_chunk,
+                batched(lines, self.chunk_size),
+            ):
+                self.merge(chunk_state)
+        return self.result()
+
+    @final
+    def append_lines(
+            self,
+            lines: Iterable[str],
+    ) -> tuple[ResultType, ResultType]:
+        """
+        Return the answers to Parts 1 and 2 of the Advent of Code
+        puzzle, after adding lines to the ones fed so far.
+
+        Any `@answer` assertion on `result()` is skipped, as the answers
+        are expected to change once lines are added.
+
+        Parameters
+        ----------
+        lines : iterable of str
+            Lines of input to add.
+
+        Returns
+        -------
+        tuple of (ResultType, ResultType)
+            The Part 1 solution and the Part 2 solution.
+        """
+        for line in lines:
+            self.feed(line.removesuffix("\n"))
+        # NOTE Decorators made with functools.wraps keep the function
+        # they wrap, so the undecorated result() can be called.
+        result = inspect.unwrap(type(self).result)
+        return result(self)
+
+    @final
+    def run_and_print_stream(self, lines: Iterable[str]):
+        print(f"## Solutions for Advent of Code {self.year} Day {self.day}")
+
+        self._print_answers(self.answer_stream(lines))
+
+    @final
+    def _feed_chunk(self, chunk: Iterable[str]) -> Self:
+        state = type(self)(
+            run_if_slow=self.run_if_slow,
+            testing=self.testing,
+            debugging=self.debugging,
+        )
+        state.reset()
+        for line in chunk:
+            state.feed(line)
+        return state
+
+
+def _strip_blank_lines(lines: Iterable[str]) -> Iterator[str]:
+    # NOTE Blank lines are held back until a non-blank line is found, so
+    # that blank lines at the end are never yielded.
+    num_blank_lines = 0
+    started = False
+    for line in lines:
+        line = line.removesuffix("\n")
+        if not line:
+            num_blank_lines += started
+            continue
+        yield from repeat("", num_blank_lines)
+        num_blank_lines = 0
+        started = True
+        yield line
+
+
 R1 = TypeVar("R1", bound=ResultType)
 R2 = TypeVar("R2", bound=ResultType)
 S = TypeVar("S", bound=BaseSolution[Any])
@@ -321,6 +834,47 @@ def slow(
     return wrapper
 
 
+T = TypeVar("T")
+
+
+def shared(func: Callable[[S], T]) -> Callable[[S], T]:
+    """
+    Decorator to mark a solution method as a "shared stage".
+
+    A shared stage does work needed by both `part_1()` and `part_2()`
+    (e.g. parsing the input, or building a graph from it). Its result is
+    computed the first time it is called by either part, and is reused
+    on every later call until new input is read. The time taken to
+    compute it is recorded separately from the parts that use it (see
+    `BaseSolution.stage_times`).
+
+    Examples
+    --------
+    >>> class Solution(StrSplitSolution):
+    ...     @shared
+    ...     def grid(self) -> Grid[str]:
+    ...         return parse_grid(self.input)
+    ...
+    ...     def part_1(self) -> int:
+    ...         return len(self.grid())
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self: S) -> T:
+        results = self._shared_results
+        if name in results:
+            return results[name]
+        start_time = perf_counter_ns()
+        result = results[name] = func(self)
+        self._stage_times[name] = perf_counter_ns() - start_time
+        return result
+
+    # HACK The _shared attribute of the shared function is set to true.
+    setattr(wrapper, "_shared", True)
+    return wrapper
+
+
 E = TypeVar("E", ResultType, tuple[ResultType, ResultType])
 
 
@@ -1,10 +1,15 @@
 # pyright: reportArgumentType=false
-from collections.abc import Callable, Hashable, Iterable, Iterator
+from array import array
+from collections.abc import (
+    Callable, Container, Hashable, Iterable, Iterator, Sequence,
+)
 from collections import defaultdict, deque
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from heapq import heapify, heappop, heappush
-from itertools import chain, count
-from typing import Protocol, Self
+from itertools import count
+from time import perf_counter_ns
+from typing import Any, Literal, Protocol, Self, overload
 
 from ..utils.grids import taxicab_distance
 
@@ -49,6 +54,156 @@ class _PositiveInfinity:
         return self is other
 
 
+class _HeapQueue[Item]:
+    """
+    Priority queue backed by a binary heap.
+
+    Priorities can be pushed in any order.
+    """
+    def __init__(self):
+        self._heap: list[tuple[int, int, Item]] = []
+        # HACK The items pushed onto the heap must be comparable; having
+        # an item from this counter between the priority and the item
+        # ensures that they are, even if items are not comparable.
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, priority: int, item: Item):
+        heappush(self._heap, (priority, next(self._counter), item))
+
+    def pop(self) -> tuple[int, Item]:
+        priority, _, item = heappop(self._heap)
+        return priority, item
+
+    def peek(self) -> int:
+        return self._heap[0][0]
+
+
+class _BucketQueue[Item]:
+    """
+    Priority queue with one bucket of items per priority (also known as
+    Dial's algorithm).
+
+    No priority can be pushed that is lower than the last priority
+    popped. Pushing is O(1), and popping is O(C), where C is the
+    largest edge weight; this is fastest when edge weights are small.
+    """
+    def __init__(self):
+        # NOTE Each bucket holds its distances and items interleaved,
+        # so no tuples are created for them.
+        self._buckets: dict[int, list[Any]] = {}
+        self._current = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, priority: int, distance: int, item: Item):
+        if priority < self._current:
+            raise ValueError(
+                f"priority {priority} is lower than the last priority "
+                f"popped ({self._current})"
+            )
+        bucket = self._buckets.get(priority)
+        if bucket is None:
+            self._buckets[priority] = bucket = []
+        bucket.append(distance)
+        bucket.append(item)
+        self._size += 1
+
+    def pop(self) -> tuple[int, Item]:
+        if not self._size:
+            raise IndexError("pop from empty queue")
+        buckets = self._buckets
+        # NOTE There are only as many buckets as there are distinct
+        # priorities in the queue (at most one more than the largest
+        # edge weight), so finding the lowest one is cheap.
+        bucket = buckets.get(self._current)
+        if bucket is None:
+            self._current = min(buckets)
+            bucket = buckets[self._current]
+        item = bucket.pop()
+        distance = bucket.pop()
+        if not bucket:
+            del buckets[self._current]
+        self._size -= 1
+        return distance, item
+
+
+class _RadixHeap[Item]:
+    """
+    Priority queue for monotone integer priorities (a "radix heap").
+
+    No priority can be pushed that is lower than the last priority
+    popped. Items are bucketed by the highest bit in which their
+    priority differs from the last priority popped; each item can only
+    move to a lower bucket, so popping is O(log C) amortized, where C is
+    the largest edge weight. This is fastest when edge weights are
+    large or widely spread.
+    """
+    def __init__(self):
+        # NOTE Priorities, distances, and items are kept in parallel
+        # lists, so no tuples are created for them.
+        self._priorities: list[list[int]] = [[]]
+        self._distances: list[list[int]] = [[]]
+        self._items: list[list[Item]] = [[]]
+        self._last = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, priority: int, distance: int, item: Item):
+        if priority < self._last:
+            raise ValueError(
+                f"priority {priority} is lower than the last priority "
+                f"popped ({self._last})"
+            )
+        index = (priority ^ self._last).bit_length()
+        while len(self._priorities) <= index:
+            self._priorities.append([])
+            self._distances.append([])
+            self._items.append([])
+        self._priorities[index].append(priority)
+        self._distances[index].append(distance)
+        self._items[index].append(item)
+        self._size += 1
+
+    def pop(self) -> tuple[int, Item]:
+        if not self._size:
+            raise IndexError("pop from empty queue")
+        if not self._priorities[0]:
+            # Redistribute the first non-empty bucket around its lowest
+            # priority; all of its items move to lower buckets
+            index = 1
+            while not self._priorities[index]:
+                index += 1
+            priorities = self._priorities[index]
+            distances = self._distances[index]
+            items = self._items[index]
+            self._priorities[index] = []
+            self._distances[index] = []
+            self._items[index] = []
+            self._last = last = min(priorities)
+            for priority, distance, item in zip(priorities, distances, items):
+                new_index = (priority ^ last).bit_length()
+                self._priorities[new_index].append(priority)
+                self._distances[new_index].append(distance)
+                self._items[new_index].append(item)
+        self._size -= 1
+        self._priorities[0].pop()
+        return self._distances[0].pop(), self._items[0].pop()
+
+
+type QueueKind = Literal["heap", "bucket", "radix"]
+_MONOTONE_QUEUES = {
+    "bucket": _BucketQueue,
+    "radix": _RadixHeap,
+}
+
+
 class PathState[Node](Hashable, Protocol):
     """
     Protocol defining the interface for states used in pathfinding.
@@ -60,6 +215,178 @@ class PathState[Node](Hashable, Protocol):
     def node(self) -> Node: ...
 
 
+def _states_on_paths[State](
+        end_states: Iterable[State],
+        predecessors: Callable[[State], Iterable[State]],
+) -> set[State]:
+    # NOTE Every state reachable backwards from an end state through the
+    # predecessor DAG is on some shortest path.
+    seen = set(end_states)
+    stack = list(seen)
+    while stack:
+        for prev_state in predecessors(stack.pop()):
+            if prev_state not in seen:
+                seen.add(prev_state)
+                stack.append(prev_state)
+    return seen
+
+
+def _count_paths[State](
+        end_states: Iterable[State],
+        start_states: Container[State],
+        predecessors: Callable[[State], Iterable[State]],
+) -> int:
+    # NOTE The number of paths to a state is the sum of the numbers of
+    # paths to its predecessors; each state's count is found after all
+    # of its predecessors' counts, by an iterative depth-first search.
+    counts: dict[State, int] = {}
+    for end_state in end_states:
+        stack = [end_state]
+        while stack:
+            state = stack[-1]
+            if state in counts:
+                stack.pop()
+                continue
+            if state in start_states:
+                counts[state] = 1
+                stack.pop()
+                continue
+            missing = [p for p in predecessors(state) if p not in counts]
+            if missing:
+                stack.extend(missing)
+                continue
+            counts[state] = sum(counts[p] for p in predecessors(state))
+            stack.pop()
+    return sum(counts[s] for s in dict.fromkeys(end_states))
+
+
+def _iter_paths[State](
+        end_states: Iterable[State],
+        start_states: Container[State],
+        predecessors: Callable[[State], Iterable[State]],
+) -> Iterator[list[State]]:
+    # NOTE Paths are walked backwards from each end state with one
+    # shared stack, so paths with a common prefix share the work of
+    # building it; only the yielded lists are copies.
+    done = object()
+    for end_state in end_states:
+        if end_state in start_states:
+            yield [end_state]
+            continue
+        path = [end_state]
+        pending = [iter(predecessors(end_state))]
+        while pending:
+            prev_state = next(pending[-1], done)
+            if prev_state is done:
+                pending.pop()
+                path.pop()
+                continue
+            path.append(prev_state)
+            if prev_state in start_states:
+                yield path[::-1]
+                path.pop()
+                continue
+            pending.append(iter(predecessors(prev_state)))
+
+
+@dataclass
+class SearchStats:
+    """
+    Counters collected while running a search.
+
+    Attributes
+    ----------
+    search : str
+        Name of the search function.
+    states_expanded : int
+        Number of states whose transitions were followed.
+    edges_relaxed : int
+        Number of transitions followed.
+    stale_pops : int
+        Number of states popped from the queue that were skipped, as
+        they had since been reached with a lower distance.
+    peak_queue_size : int
+        Largest number of items in the queue at once.
+    peak_predecessors : int
+        Largest number of predecessor records kept at once (states with
+        predecessors, or predecessor links for
+        `find_shortest_paths_indexed`).
+    wall_time_ns : int
+        Time taken by the search, in nanoseconds.
+    """
+    search: str
+    states_expanded: int = 0
+    edges_relaxed: int = 0
+    stale_pops: int = 0
+    peak_queue_size: int = 0
+    peak_predecessors: int = 0
+    wall_time_ns: int = 0
+
+
+# NOTE While collect_search_stats() is active, this is the list that
+# every search adds its stats to.
+_stats_collector: list[SearchStats] | None = None
+
+
+@contextmanager
+def collect_search_stats() -> Iterator[list[SearchStats]]:
+    """
+    Collect stats from every search run within a `with` block.
+
+    Returns
+    -------
+    context manager of list of SearchStats
+        Context manager giving a list, which the stats of each search
+        are added to as it runs.
+
+    Examples
+    --------
+    >>> with collect_search_stats() as all_stats:
+    ...     result = find_shortest_paths(...)
+    >>> all_stats[0].states_expanded
+    """
+    global _stats_collector
+    previous_collector = _stats_collector
+    _stats_collector = collected = []
+    try:
+        yield collected
+    finally:
+        _stats_collector = previous_collector
+
+
+def _new_stats(search: str, collect_stats: bool | None) -> SearchStats | None:
+    # NOTE By default, stats are only collected if collect_search_stats()
+    # is active.
+    if collect_stats is None:
+        collect_stats = _stats_collector is not None
+    if not collect_stats:
+        return None
+    stats = SearchStats(search)
+    if _stats_collector is not None:
+        _stats_collector.append(stats)
+    return stats
+
+
+def _update_peaks(stats: SearchStats, queue_size: int, num_predecessors: int):
+    if queue_size > stats.peak_queue_size:
+        stats.peak_queue_size = queue_size
+    if num_predecessors > stats.peak_predecessors:
+        stats.peak_predecessors = num_predecessors
+
+
+def _finish_stats(
+        stats: SearchStats,
+        start_time: int,
+        num_expanded: int,
+        num_relaxed: int,
+        num_stale: int,
+):
+    stats.states_expanded = num_expanded
+    stats.edges_relaxed = num_relaxed
+    stats.stale_pops = num_stale
+    stats.wall_time_ns = perf_counter_ns() - start_time
+
+
 # HACK The type checker complains when I constrain the generic typevar
 # State by PathState[Node], since Node is also a generic typevar. The
 # only thing I can do about this seems to be to ignore it. (This will
@@ -69,15 +396,91 @@ class PathResult[Node, State: PathState[Node]]:  # pyright: ignore[reportGeneral
     """
     Result of `find_shortest_paths`.
 
+    The shortest paths are stored as a predecessor DAG: a directed
+    acyclic graph linking each state to every state directly before it
+    on a shortest path to it. Questions about all shortest paths (e.g.
+    which nodes are on any of them) can be answered from it in linear
+    time, even when there are exponentially many paths.
+
     Attributes
     ----------
     distance : int
         The shortest path distance.
-    paths : iterator of list of state
-        Iterator yielding each shortest path as a list of states.
+    start_states : frozenset of state
+        States at the start of the paths.
+    end_states : list of state
+        Ending states reached at the shortest path distance.
+    prev_states : dict of {state : set of state}
+        Predecessors of each state on shortest paths to it.
+    stats : SearchStats or None
+        Stats collected during the search, if any were.
     """
     distance: int
-    paths: Iterator[list[State]]
+    start_states: frozenset[State]
+    end_states: list[State]
+    prev_states: dict[State, set[State]]
+    stats: SearchStats | None = field(default=None, compare=False)
+
+    def predecessors(self, state: State) -> Iterator[State]:
+        """
+        Yield each state that is directly before a state on a shortest
+        path to it.
+
+        Parameters
+        ----------
+        state : state
+            State to find the predecessors of.
+
+        Returns
+        -------
+        iterator of state
+            Predecessors of `state`.
+        """
+        return iter(self.prev_states.get(state, ()))
+
+    @property
+    def paths(self) -> Iterator[list[State]]:
+        """
+        Iterator yielding each shortest path as a list of states.
+        """
+        return _iter_paths(
+            self.end_states, self.start_states, self.predecessors,
+        )
+
+    def states_on_shortest_paths(self) -> set[State]:
+        """
+        Return every state on any shortest path.
+
+        Returns
+        -------
+        set of state
+            States on at least one shortest path.
+        """
+        return _states_on_paths(self.end_states, self.predecessors)
+
+    def nodes_on_shortest_paths(self) -> set[Node]:
+        """
+        Return every node on any shortest path.
+
+        Returns
+        -------
+        set of node
+            Nodes of the states on at least one shortest path.
+        """
+        return {state.node for state in self.states_on_shortest_paths()}
+
+    def count_shortest_paths(self) -> int:
+        """
+        Count the shortest paths, without listing them.
+
+        Returns
+        -------
+        int
+            Number of distinct shortest paths.
+        """
+        return _count_paths(
+            self.end_states, self.start_states, self.predecessors,
+        )
 
 
 # Custom exception: no path exists
@@ -92,6 +495,8 @@ def find_shortest_paths[Node, State: PathState[Node]](  # pyright: ignore[report
         *,
         get_transitions: Callable[[State], Iterable[tuple[State, int]]],
         heuristic: Callable[[Node, Node], int] | None = None,
+        queue: QueueKind = "heap",
+        collect_stats: bool | None = None,
 ) -> PathResult[Node, State]:
     """
     Find the shortest paths between starting states and an ending node.
@@ -126,6 +531,17 @@ def find_shortest_paths[Node, State: PathState[Node]](  # pyright: ignore[report
         target_node)` as arguments and returns an estimated distance to
         reach the target. For grid-based pathfinding, Manhattan distance
         (a.k.a. taxicab distance) is commonly used.
+    queue : {"heap", "bucket", "radix"}, default "heap"
+        Kind of priority queue to use. "heap" is a binary heap, and
+        works with any distances and heuristic. "bucket" is a bucket
+        queue, best for small integer distances (e.g. 1 to 9). "radix"
+        is a radix heap, best for widely spread integer distances (e.g.
+        1 or 1000). The latter two require the heuristic (if any) to be
+        consistent, so that priorities never decrease.
+    collect_stats : bool, optional
+        Whether to collect stats about the search (see `SearchStats`).
+        By default, they are only collected inside a
+        `collect_search_stats()` block.
 
     Returns
     -------
@@ -134,6 +550,9 @@ def find_shortest_paths[Node, State: PathState[Node]](  # pyright: ignore[report
             - distance: int, the shortest path distance
             - paths: iterator yielding each shortest path as a list of
             states
+            - the predecessor DAG of the shortest paths, with methods to
+            find the nodes on them and count them
+            - stats: stats about the search (if collected)
 
     Notes
     -----
@@ -148,6 +567,10 @@ def find_shortest_paths[Node, State: PathState[Node]](  # pyright: ignore[report
     For grid-based pathfinding, a commonly used heuristic is Manhattan
     distance (a.k.a. taxicab distance).
 
+    The "bucket" and "radix" queues push and pop in amortized O(1) and
+    O(log C) time respectively (where C is the largest distance between
+    states), compared to O(log n) for the heap.
+
     Examples
     --------
     >>> # Dijkstra's algorithm (no heuristic)
@@ -178,26 +601,44 @@ def find_shortest_paths[Node, State: PathState[Node]](  # pyright: ignore[report
         {(s, 0) for s in start_states_set},
     )
     prev_states: dict[State, set[State]] = defaultdict(set)
-    # HACK The items pushed onto the priority queue must be comparable;
-    # having an item from this counter between the metadata and the
-    # state ensure that they are, even if states are not comparable.
-    counter = count()
+    stats = _new_stats("find_shortest_paths", collect_stats)
+    start_time = perf_counter_ns()
+    num_expanded = num_relaxed = num_stale = 0
 
     # NOTE For A*, priority = distance + heuristic; for Dijkstra,
     # priority is distance.
-    def get_priority(distance: int, node: Node) -> int:
-        return distance + (heuristic(node, end_node) if heuristic else 0)
+    def get_heuristic(node: Node) -> int:
+        return heuristic(node, end_node) if heuristic else 0
 
-    priority_queue: list[tuple[int, int, int, State]] = [
-        (get_priority(0, s.node), 0, next(counter), s)
-        for s in start_states_set
-    ]
-    heapify(priority_queue)
+    # NOTE Each state is pushed along with its distance, so the
+    # heuristic doesn't need to be computed again when it is popped. The
+    # heap is used directly, with flat `(priority, distance, counter,
+    # state)` tuples; the counter keeps states from being compared.
+    heap: list[tuple[int, int, int, State]] | None = None
+    monotone_queue: _BucketQueue[State] | _RadixHeap[State] | None = None
+    if queue == "heap":
+        heap = []
+        counter = count()
+        for s in start_states_set:
+            heap.append((get_heuristic(s.node), 0, next(counter), s))
+        heapify(heap)
+        priority_queue = heap
+    else:
+        try:
+            monotone_queue = _MONOTONE_QUEUES[queue]()
+        except KeyError:
+            raise ValueError(f"unknown queue kind: {queue!r}") from None
+        for s in start_states_set:
+            monotone_queue.push(get_heuristic(s.node), 0, s)
+        priority_queue = monotone_queue
     shortest_distance: int | None = None
     end_states: list[State] = []
 
     while priority_queue:
-        _, distance, _, state = heappop(priority_queue)
+        if heap is not None:
+            _, distance, _, state = heappop(heap)
+        else:
+            distance, state = monotone_queue.pop()
 
         # If we've found an end state, record the distance
         if state.node == end_node:
@@ -212,9 +653,12 @@ def find_shortest_paths[Node, State: PathState[Node]](  # pyright: ignore[report
 
         # Skip if we've already found this state with a lower distance
         if distances[state] < distance:
+            num_stale += 1
             continue
 
+        num_expanded += 1
         for next_state, distance_to_next_state in get_transitions(state):
+            num_relaxed += 1
             prev_distance = distances[next_state]
             next_distance = distance + distance_to_next_state
 
@@ -222,39 +666,1864 @@ def find_shortest_paths[Node, State: PathState[Node]](  # pyright: ignore[report
             if next_distance < prev_distance:
                 # Update distances and continue searching from here
                 distances[next_state] = next_distance
-                priority = get_priority(next_distance, next_state.node)
-                heappush(
-                    priority_queue,
-                    (priority, next_distance, next(counter), next_state),
-                )
+                priority = next_distance + get_heuristic(next_state.node)
+                if heap is not None:
+                    heappush(heap, (
+                        priority, next_distance, next(counter), next_state,
+                    ))
+                else:
+                    monotone_queue.push(priority, next_distance, next_state)
                 # No other path to here has been optimal yet
                 prev_states[next_state].clear()
+                if stats is not None:
+                    _update_peaks(
+                        stats, len(priority_queue), len(prev_states),
+                    )
 
             # If this isn't a higher-distance way to get here
             if next_distance <= prev_distance:
                 # The state we got here from is on an optimal path
                 prev_states[next_state].add(state)
 
+    if stats is not None:
+        _finish_stats(
+            stats, start_time, num_expanded, num_relaxed, num_stale,
+        )
     if shortest_distance is None:
         raise NoPathError(
             f"no path exists from {start_node!r} to {end_node!r}"
         )
 
-    # Generate all paths lazily
-    def paths_ending_at(state: State) -> Iterator[list[State]]:
-        """Generate all paths ending at `state`."""
-        if state in start_states_set:
-            yield [state]
-            return
-        for prev_state in prev_states[state]:
-            for path in paths_ending_at(prev_state):
-                yield path + [state]
+    return PathResult(
+        distance=shortest_distance,
+        start_states=frozenset(start_states_set),
+        end_states=end_states,
+        prev_states=prev_states,
+        stats=stats,
+    )
+
+
+def find_shortest_paths_bidirectional[Node, State: PathState[Node]](  # pyright: ignore[reportGeneralTypeIssues]
+        start_states: Iterable[State],  # must be non-empty
+        end_states: Iterable[State],  # must be non-empty
+        *,
+        get_transitions: Callable[[State], Iterable[tuple[State, int]]],
+        get_reverse_transitions: (
+            Callable[[State], Iterable[tuple[State, int]]] | None
+        ) = None,
+) -> PathResult[Node, State]:
+    """
+    Find the shortest paths between starting states and ending states,
+    searching forward from the start and backward from the end at once.
+
+    The two searches take turns expanding whichever frontier is closer
+    to its origin, and stop once no path through the unexplored states
+    could be as short as the shortest path found where they meet. This
+    usually explores far fewer states than a one-way search; on an open
+    grid, it explores two disks of half the radius, which is about half
+    the area.
+
+    Parameters
+    ----------
+    start_states : iterable of state
+        States at the start of the paths. Must be non-empty. All states
+        must have the same node value. States must have a `node`
+        property representing its node and be hashable.
+    end_states : iterable of state
+        States at the end of the paths. Must be non-empty. (Unlike with
+        `find_shortest_paths`, the backward search has to start from
+        states, not a node.)
+    get_transitions : callable
+        Callable that takes a state as argument, and returns an iterable
+        of `(next_state, distance)` tuples. All distances must be
+        non-negative to ensure correct results.
+    get_reverse_transitions : callable, optional
+        Callable that takes a state as argument, and returns an iterable
+        of `(prev_state, distance)` tuples, one for each transition from
+        `prev_state` to the given state. If not provided, transitions
+        are assumed to be symmetric (as with moves between cells of a
+        grid, where the states are just the cells), and
+        `get_transitions` is used.
+
+    Returns
+    -------
+    PathResult
+        Same as for `find_shortest_paths`. Every tied shortest path is
+        included in the predecessor DAG.
+
+    Notes
+    -----
+    Only Dijkstra's algorithm is used; a heuristic can't be given, as
+    bidirectional A* needs a pair of heuristics that agree with each
+    other to stop correctly.
+    """
+    start_states_set: set[State] = set(start_states)
+    end_states_set: set[State] = set(end_states)
+    if not start_states_set:
+        raise ValueError("start_states must be non-empty")
+    if not end_states_set:
+        raise ValueError("end_states must be non-empty")
+    # Verify all start states have the same node
+    start_node = next(iter(start_states_set)).node
+    if not all(s.node == start_node for s in start_states_set):
+        raise ValueError("all start states must have the same node")
+    if get_reverse_transitions is None:
+        get_reverse_transitions = get_transitions
+
+    # A start state might already be an end state
+    if start_states_set & end_states_set:
+        return PathResult(
+            distance=0,
+            start_states=frozenset(start_states_set),
+            end_states=list(start_states_set & end_states_set),
+            prev_states={},
+        )
+
+    # NOTE Everything is kept as a pair: index 0 for the forward search,
+    # and index 1 for the backward search. For the backward search, the
+    # "previous" states are the states after a state on a path.
+    FORWARD, BACKWARD = 0, 1
+    distances: tuple[
+        dict[State, int | _PositiveInfinity],
+        dict[State, int | _PositiveInfinity],
+    ] = (
+        defaultdict(_PositiveInfinity, {(s, 0) for s in start_states_set}),
+        defaultdict(_PositiveInfinity, {(s, 0) for s in end_states_set}),
+    )
+    links: tuple[dict[State, set[State]], dict[State, set[State]]] = (
+        defaultdict(set), defaultdict(set),
+    )
+    settled: tuple[set[State], set[State]] = set(), set()
+    queues: tuple[_HeapQueue[State], _HeapQueue[State]] = (
+        _HeapQueue(), _HeapQueue(),
+    )
+    for s in start_states_set:
+        queues[FORWARD].push(0, s)
+    for s in end_states_set:
+        queues[BACKWARD].push(0, s)
+    transitions = (get_transitions, get_reverse_transitions)
+
+    shortest_distance: int | _PositiveInfinity = _PositiveInfinity()
+    # Transitions (in the forward direction) where the searches met
+    meetings: list[tuple[State, State, int]] = []
+
+    while queues[FORWARD] and queues[BACKWARD]:
+        forward_top = queues[FORWARD].peek()
+        backward_top = queues[BACKWARD].peek()
+        # NOTE Every state not yet settled by either search is at least
+        # the top priority from its origin, so no path through one is
+        # shorter than this. (Paths as short are still searched, so all
+        # tied shortest paths are found.)
+        if forward_top + backward_top > shortest_distance:
+            break
+        side = FORWARD if forward_top <= backward_top else BACKWARD
+        other = 1 - side
+
+        distance, state = queues[side].pop()
+        # Skip if we've already found this state with a lower distance
+        if state in settled[side] or distances[side][state] < distance:
+            continue
+        settled[side].add(state)
+
+        for next_state, distance_to_next_state in transitions[side](state):
+            prev_distance = distances[side][next_state]
+            next_distance = distance + distance_to_next_state
+
+            # If this is a lower-distance way to get here
+            if next_distance < prev_distance:
+                # Update distances and continue searching from here
+                distances[side][next_state] = next_distance
+                queues[side].push(next_distance, next_state)
+                # No other path to here has been optimal yet
+                links[side][next_state].clear()
+
+            # If this isn't a higher-distance way to get here
+            if next_distance <= prev_distance:
+                # The state we got here from is on an optimal path
+                links[side][next_state].add(state)
 
-    all_paths = chain.from_iterable(map(paths_ending_at, end_states))
+            # If the other search has reached the next state, the
+            # searches have met
+            other_distance = distances[other][next_state]
+            if other_distance == _PositiveInfinity():
+                continue
+            total_distance = next_distance + other_distance
+            if total_distance > shortest_distance:
+                continue
+            shortest_distance = total_distance
+            # NOTE Only meetings between states that both searches have
+            # settled are kept; every shortest path has one of these,
+            # and the distances to both states are known to be final.
+            if next_state in settled[other]:
+                meeting = (
+                    (state, next_state) if side == FORWARD
+                    else (next_state, state)
+                )
+                meetings.append((*meeting, total_distance))
+
+    if shortest_distance == _PositiveInfinity():
+        raise NoPathError(
+            f"no path exists from {start_node!r} to the end states"
+        )
+
+    # Join the two searches' predecessors into one predecessor DAG,
+    # keeping only the parts on shortest paths
+    prev_states: dict[State, set[State]] = defaultdict(set)
+    forward_stack: list[State] = []
+    backward_stack: list[State] = []
+    for before, after, total_distance in meetings:
+        if total_distance == shortest_distance:
+            prev_states[after].add(before)
+            forward_stack.append(before)
+            backward_stack.append(after)
+    forward_stack = list(dict.fromkeys(forward_stack))
+    seen = set(forward_stack)
+    while forward_stack:
+        state = forward_stack.pop()
+        for prev_state in links[FORWARD].get(state, ()):
+            prev_states[state].add(prev_state)
+            if prev_state not in seen:
+                seen.add(prev_state)
+                forward_stack.append(prev_state)
+    backward_stack = list(dict.fromkeys(backward_stack))
+    seen = set(backward_stack)
+    reached_end_states: list[State] = []
+    while backward_stack:
+        state = backward_stack.pop()
+        if state in end_states_set:
+            reached_end_states.append(state)
+        for next_state in links[BACKWARD].get(state, ()):
+            prev_states[next_state].add(state)
+            if next_state not in seen:
+                seen.add(next_state)
+                backward_stack.append(next_state)
 
     return PathResult(
+        distance=shortest_distance,  # pyright: ignore[reportArgumentType]
+        start_states=frozenset(start_states_set),
+        end_states=reached_end_states,
+        prev_states=prev_states,
+    )
+
+
+# NOTE This is the distance of a state that was never reached by
+# find_shortest_paths_indexed (the largest value an array("q") holds).
+UNREACHED = (1 << 63) - 1
+
+
+@dataclass(frozen=True)
+class IndexedPathResult:
+    """
+    Result of `find_shortest_paths_indexed`.
+
+    Attributes
+    ----------
+    distance : int
+        The shortest path distance.
+    end_states : list of int
+        Ending states reached at the shortest path distance.
+    distances : array of int
+        Shortest known distance to each state (`UNREACHED` if it was
+        never reached).
+    stats : SearchStats or None
+        Stats collected during the search, if any were.
+    """
+    distance: int
+    end_states: list[int]
+    distances: array
+    start_states: frozenset[int]
+    # NOTE The predecessors of each state on a shortest path to it are
+    # kept as a linked list: pred_heads[state] is the index of its first
+    # entry in pred_states (or -1 if it has none), and pred_links[entry]
+    # is the index of the next entry.
+    pred_heads: array
+    pred_states: array
+    pred_links: array
+    stats: SearchStats | None = field(default=None, compare=False)
+
+    def predecessors(self, state: int) -> Iterator[int]:
+        """
+        Yield each state that is directly before a state on a shortest
+        path to it.
+
+        Parameters
+        ----------
+        state : int
+            State to find the predecessors of.
+
+        Returns
+        -------
+        iterator of int
+            Predecessors of `state`.
+        """
+        entry = self.pred_heads[state]
+        while entry >= 0:
+            yield self.pred_states[entry]
+            entry = self.pred_links[entry]
+
+    @property
+    def paths(self) -> Iterator[list[int]]:
+        """
+        Iterator yielding each shortest path as a list of states.
+        """
+        return _iter_paths(
+            self.end_states, self.start_states, self.predecessors,
+        )
+
+    def states_on_shortest_paths(self) -> set[int]:
+        """
+        Return every state on any shortest path.
+
+        Returns
+        -------
+        set of int
+            States on at least one shortest path.
+        """
+        return _states_on_paths(self.end_states, self.predecessors)
+
+    def count_shortest_paths(self) -> int:
+        """
+        Count the shortest paths, without listing them.
+
+        Returns
+        -------
+        int
+            Number of distinct shortest paths.
+        """
+        return _count_paths(
+            self.end_states, self.start_states, self.predecessors,
+        )
+
+
+def find_shortest_paths_indexed(
+        num_states: int,
+        start_states: Iterable[int],  # must be non-empty
+        is_end: Callable[[int], bool],
+        *,
+        get_transitions: Callable[[int], Iterable[int]],
+        heuristic: Callable[[int], int] | None = None,
+        queue: QueueKind = "heap",
+        collect_stats: bool | None = None,
+) -> IndexedPathResult:
+    """
+    Find the shortest paths between starting states and any ending
+    state, where states are integers from 0 to `num_states - 1`.
+
+    This is an alternative to `find_shortest_paths` for state spaces
+    that can be numbered (e.g. grid cell, facing direction, and step
+    count packed into one integer). Distances and predecessors are kept
+    in flat arrays instead of dicts, and the priority queue holds plain
+    integers, so far less memory and time is spent per state.
+
+    Parameters
+    ----------
+    num_states : int
+        Number of states. Every state must be an `int` from 0 to
+        `num_states - 1`.
+    start_states : iterable of int
+        States at the start of the paths. Must be non-empty.
+    is_end : callable
+        Callable that takes a state as argument, and returns whether it
+        is an ending state.
+    get_transitions : callable
+        Callable that takes a state as argument, and returns an iterable
+        of transitions, each packed into an `int` as
+        `distance * num_states + next_state`. All distances must be
+        non-negative to ensure correct results.
+    heuristic : callable, optional
+        Admissible heuristic function that takes a state as argument and
+        returns an estimated distance from it to an ending state.
+    queue : {"heap", "bucket", "radix"}, default "heap"
+        Kind of priority queue to use (see `find_shortest_paths`).
+    collect_stats : bool, optional
+        Whether to collect stats about the search (see `SearchStats`).
+        By default, they are only collected inside a
+        `collect_search_stats()` block.
+
+    Returns
+    -------
+    IndexedPathResult
+        Contains the shortest path distance, the ending states reached
+        at that distance, and the predecessor DAG of the shortest
+        paths.
+
+    Notes
+    -----
+    As with `find_shortest_paths`, A* is used if a heuristic is
+    provided, and Dijkstra's algorithm is used otherwise.
+
+    Examples
+    --------
+    >>> # Move right 1 cell for 1 point, or 2 cells for 3 points
+    >>> result = find_shortest_paths_indexed(
+    ...     num_cells,
+    ...     [0],
+    ...     lambda s: s == num_cells - 1,
+    ...     get_transitions=lambda s: (
+    ...         1 * num_cells + s + 1,
+    ...         3 * num_cells + s + 2,
+    ...     ),
+    ... )
+    """
+    start_states_set = frozenset(start_states)
+    if not start_states_set:
+        raise ValueError("start_states must be non-empty")
+    if not all(0 <= s < num_states for s in start_states_set):
+        raise ValueError("start states must be from 0 to num_states - 1")
+
+    distances = array("q", [UNREACHED]) * num_states
+    pred_heads = array("q", [-1]) * num_states
+    pred_states = array("q")
+    pred_links = array("q")
+    stats = _new_stats("find_shortest_paths_indexed", collect_stats)
+    start_time = perf_counter_ns()
+    num_expanded = num_relaxed = num_stale = 0
+
+    # NOTE Each heap item is a single int, priority * num_states +
+    # state, so items compare by priority without any tuples. The
+    # bucket queue is kept inline as a dict of lists of states, since
+    # its pushes and pops are cheaper than the heap's when they aren't
+    # method calls.
+    heap: list[int] | None = None
+    buckets: dict[int, list[int]] | None = None
+    radix_heap: _RadixHeap[int] | None = None
+    current_priority = 0
+    for s in start_states_set:
+        distances[s] = 0
+    start_priorities = [
+        (heuristic(s) if heuristic else 0, s) for s in start_states_set
+    ]
+    if queue == "heap":
+        heap = [priority * num_states + s for priority, s in start_priorities]
+        heapify(heap)
+        priority_queue = heap
+    elif queue == "bucket":
+        buckets = {}
+        for priority, s in start_priorities:
+            buckets.setdefault(priority, []).append(s)
+        priority_queue = buckets
+    elif queue == "radix":
+        radix_heap = _RadixHeap()
+        for priority, s in start_priorities:
+            radix_heap.push(priority, 0, s)
+        priority_queue = radix_heap
+    else:
+        raise ValueError(f"unknown queue kind: {queue!r}")
+    shortest_distance: int | None = None
+    end_states: list[int] = []
+
+    while priority_queue:
+        if heap is not None:
+            priority, state = divmod(heappop(heap), num_states)
+            distance = priority - (heuristic(state) if heuristic else 0)
+        elif buckets is not None:
+            # NOTE Emptied buckets are removed, so the lowest priority
+            # is the current one or the lowest bucket left.
+            bucket = buckets.get(current_priority)
+            if bucket is None:
+                current_priority = min(buckets)
+                bucket = buckets[current_priority]
+            state = bucket.pop()
+            if not bucket:
+                del buckets[current_priority]
+            distance = current_priority - (
+                heuristic(state) if heuristic else 0
+            )
+        else:
+            distance, state = radix_heap.pop()
+
+        # If we've found an end state, record the distance
+        if is_end(state):
+            if shortest_distance is None:
+                shortest_distance = distance
+            # Continue until we exceed the shortest distance (so we find
+            # all ending states at the same distance)
+            if distance > shortest_distance:
+                break
+            end_states.append(state)
+            continue
+
+        # Skip if we've already found this state with a lower distance
+        if distances[state] < distance:
+            num_stale += 1
+            continue
+
+        num_expanded += 1
+        for transition in get_transitions(state):
+            num_relaxed += 1
+            distance_to_next_state, next_state = divmod(
+                transition, num_states,
+            )
+            prev_distance = distances[next_state]
+            next_distance = distance + distance_to_next_state
+
+            # If this is a lower-distance way to get here
+            if next_distance < prev_distance:
+                # Update distances and continue searching from here
+                distances[next_state] = next_distance
+                priority = next_distance + (
+                    heuristic(next_state) if heuristic else 0
+                )
+                if heap is not None:
+                    heappush(heap, priority * num_states + next_state)
+                elif buckets is not None:
+                    bucket = buckets.get(priority)
+                    if bucket is None:
+                        buckets[priority] = [next_state]
+                    else:
+                        bucket.append(next_state)
+                else:
+                    radix_heap.push(priority, next_distance, next_state)
+                # No other path to here has been optimal yet
+                pred_heads[next_state] = -1
+                if stats is not None:
+                    queue_size = (
+                        sum(map(len, buckets.values()))
+                        if buckets is not None
+                        else len(priority_queue)
+                    )
+                    _update_peaks(stats, queue_size, len(pred_states))
+
+            # If this isn't a higher-distance way to get here
+            if next_distance <= prev_distance:
+                # The state we got here from is on an optimal path (and
+                # if it has just been recorded, it was through another
+                # transition to the same state)
+                head = pred_heads[next_state]
+                if head >= 0 and pred_states[head] == state:
+                    continue
+                pred_links.append(head)
+                pred_heads[next_state] = len(pred_states)
+                pred_states.append(state)
+
+    if stats is not None:
+        _finish_stats(
+            stats, start_time, num_expanded, num_relaxed, num_stale,
+        )
+    if shortest_distance is None:
+        raise NoPathError("no path exists from the start states to an end")
+
+    return IndexedPathResult(
         distance=shortest_distance,
-        paths=all_paths,
+        end_states=end_states,
+        distances=distances,
+        start_states=start_states_set,
+        pred_heads=pred_heads,
+        pred_states=pred_states,
+        pred_links=pred_links,
+        stats=stats,
+    )
+
+
+@dataclass(frozen=True)
+class DistanceField[State: Hashable]:
+    """
+    Result of `distance_field`.
+
+    Attributes
+    ----------
+    distances : dict of {state : int} or array of int
+        Distance to each reached state. If the states are numbered, this
+        is an array, with `UNREACHED` for states that were not reached.
+    layer_sizes : list of int
+        Number of states reached at each distance (so `layer_sizes[d]`
+        is the number of states at distance `d`).
+    """
+    distances: dict[State, int] | array
+    layer_sizes: list[int]
+
+    def __getitem__(self, state: State) -> int:
+        if isinstance(self.distances, array):
+            distance = self.distances[state]  # pyright: ignore[reportCallIssue]
+            if distance == UNREACHED:
+                raise KeyError(state)
+            return distance
+        return self.distances[state]
+
+    def __contains__(self, state: State) -> bool:
+        if isinstance(self.distances, array):
+            return self.distances[state] != UNREACHED  # pyright: ignore[reportCallIssue]
+        return state in self.distances
+
+    def count_at(self, distance: int) -> int:
+        """
+        Count the states at exactly a distance.
+
+        Parameters
+        ----------
+        distance : int
+            Distance to count states at.
+
+        Returns
+        -------
+        int
+            Number of states at `distance`.
+        """
+        if 0 <= distance < len(self.layer_sizes):
+            return self.layer_sizes[distance]
+        return 0
+
+    def count_within(self, distance: int, *, parity: bool = False) -> int:
+        """
+        Count the states at most a distance away.
+
+        Parameters
+        ----------
+        distance : int
+            Maximum distance of states to count.
+        parity : bool, default False
+            If true, only count states whose distance has the same
+            parity as `distance`. (On a grid, these are the states that
+            can be reached in exactly `distance` steps, as any leftover
+            steps can be spent stepping back and forth.)
+
+        Returns
+        -------
+        int
+            Number of states counted.
+        """
+        layer_sizes = self.layer_sizes[:max(distance + 1, 0)]
+        if parity:
+            return sum(layer_sizes[distance % 2::2])
+        return sum(layer_sizes)
+
+    def parity_counts(self) -> tuple[int, int]:
+        """
+        Count the states at even and odd distances.
+
+        Returns
+        -------
+        tuple of (int, int)
+            Number of states at even distances, and number of states at
+            odd distances.
+        """
+        return sum(self.layer_sizes[::2]), sum(self.layer_sizes[1::2])
+
+
+@overload
+def distance_field[State: Hashable](
+        sources: Iterable[State],
+        transitions: Callable[[State], Iterable[State]],
+        max_distance: int | None = None,
+        *,
+        weighted: Literal[False] = False,
+        num_states: int | None = None,
+) -> DistanceField[State]: ...
+@overload
+def distance_field[State: Hashable](
+        sources: Iterable[State],
+        transitions: Callable[[State], Iterable[tuple[State, int]]],
+        max_distance: int | None = None,
+        *,
+        weighted: Literal[True],
+        num_states: int | None = None,
+) -> DistanceField[State]: ...
+def distance_field[State: Hashable](
+        sources: Iterable[State],
+        transitions: Callable[[State], Iterable[Any]],
+        max_distance: int | None = None,
+        *,
+        weighted: bool = False,
+        num_states: int | None = None,
+) -> DistanceField[State]:
+    """
+    Find the distance from the nearest source to every reachable state.
+
+    Unlike `find_shortest_paths`, there is no target; the search only
+    stops when every reachable state (within `max_distance`, if given)
+    has been reached.
+
+    Parameters
+    ----------
+    sources : iterable of state
+        States to measure distances from. Each has distance 0. States
+        must be hashable.
+    transitions : callable
+        Callable that takes a state as argument, and returns an iterable
+        of next states (or of `(next_state, distance)` tuples, if
+        `weighted` is true).
+    max_distance : int, optional
+        Maximum distance of states to reach.
+    weighted : bool, default False
+        If true, transitions have non-negative `int` distances, and
+        Dijkstra's algorithm is used; otherwise, every transition has a
+        distance of 1, and breadth-first search is used.
+    num_states : int, optional
+        If provided, states are `int`s from 0 to `num_states - 1`, and
+        distances are stored in an array instead of a dict.
+
+    Returns
+    -------
+    DistanceField
+        Distance to each reached state, and the number of states at each
+        distance.
+    """
+    distances: dict[State, int] | array
+    if num_states is None:
+        distances = {}
+        def is_reached(state: State) -> bool:
+            return state in distances
+    else:
+        distances = array("q", [UNREACHED]) * num_states
+        def is_reached(state: State) -> bool:
+            return distances[state] != UNREACHED  # pyright: ignore[reportCallIssue]
+
+    layer_sizes: list[int] = []
+    if not weighted:
+        # NOTE The search goes one layer (i.e. distance) at a time, so
+        # no distances need to be stored in the queue, and each layer's
+        # size is known when it is done.
+        layer = list(dict.fromkeys(sources))
+        distance = 0
+        while layer:
+            layer_sizes.append(len(layer))
+            for state in layer:
+                distances[state] = distance  # pyright: ignore[reportArgumentType]
+            if max_distance is not None and distance >= max_distance:
+                break
+            distance += 1
+            next_layer: list[State] = []
+            for state in layer:
+                for next_state in transitions(state):
+                    if not is_reached(next_state):
+                        # NOTE Marking the state now keeps it from being
+                        # added to this layer twice.
+                        distances[next_state] = distance  # pyright: ignore[reportArgumentType]
+                        next_layer.append(next_state)
+            layer = next_layer
+        return DistanceField(distances, layer_sizes)
+
+    priority_queue: _HeapQueue[State] = _HeapQueue()
+    for state in dict.fromkeys(sources):
+        distances[state] = 0  # pyright: ignore[reportArgumentType]
+        priority_queue.push(0, state)
+    settled: set[State] = set()
+    while priority_queue:
+        distance, state = priority_queue.pop()
+        if state in settled:
+            continue
+        settled.add(state)
+        while len(layer_sizes) <= distance:
+            layer_sizes.append(0)
+        layer_sizes[distance] += 1
+        for next_state, distance_to_next_state in transitions(state):
+            next_distance = distance + distance_to_next_state
+            if max_distance is not None and next_distance > max_distance:
+                continue
+            if (
+                not is_reached(next_state)
+                or next_distance < distances[next_state]  # pyright: ignore[reportCallIssue, reportOperatorIssue]
+            ):
+                distances[next_state] = next_distance  # pyright: ignore[reportArgumentType]
+                priority_queue.push(next_distance, next_state)
+    return DistanceField(distances, layer_sizes)
+
+
+type WeightedGraph[Node] = dict[Node, dict[Node, int]]
+
+
+@overload
+def compress_graph[Node: Hashable](
+        nodes: Iterable[Node],
+        neighbors: Callable[[Node], Iterable[Node]],
+        *,
+        is_junction: Callable[[Node], bool] | None = None,
+        weighted: Literal[False] = False,
+        merge_parallel: Callable[[int, int], int] = min,
+) -> WeightedGraph[Node]: ...
+@overload
+def compress_graph[Node: Hashable](
+        nodes: Iterable[Node],
+        neighbors: Callable[[Node], Iterable[tuple[Node, int]]],
+        *,
+        is_junction: Callable[[Node], bool] | None = None,
+        weighted: Literal[True],
+        merge_parallel: Callable[[int, int], int] = min,
+) -> WeightedGraph[Node]: ...
+def compress_graph[Node: Hashable](
+        nodes: Iterable[Node],
+        neighbors: Callable[[Node], Iterable[Any]],
+        *,
+        is_junction: Callable[[Node], bool] | None = None,
+        weighted: bool = False,
+        merge_parallel: Callable[[int, int], int] = min,
+) -> WeightedGraph[Node]:
+    """
+    Compress a graph by replacing each chain of nodes between junctions
+    (e.g. a hallway in a maze) with a single weighted edge.
+
+    Walking from a junction, each chain is followed (never doubling back
+    on itself) until it reaches another junction, which becomes an edge
+    with the chain's total length; chains that end at a dead end (that
+    isn't a junction) are dropped. Edges are directed, so one-way edges
+    (e.g. slopes that can only be walked down) are handled.
+
+    Parameters
+    ----------
+    nodes : iterable of node
+        Every node of the graph. Nodes must be hashable.
+    neighbors : callable
+        Callable that takes a node as argument, and returns an iterable
+        of nodes it has an edge to (or of `(next_node, distance)`
+        tuples, if `weighted` is true).
+    is_junction : callable, optional
+        Callable that takes a node as argument, and returns whether it
+        should be kept in the compressed graph (e.g. the start and end
+        of a maze, and places where paths branch). By default, a node is
+        a junction if it is not connected to exactly 2 other nodes
+        (counting edges in either direction).
+    weighted : bool, default False
+        If true, edges have `int` distances; otherwise, every edge has a
+        distance of 1.
+    merge_parallel : callable, default `min`
+        Callable that combines the distances of two chains between the
+        same junctions (`min` keeps the shortest, which suits shortest
+        path searches; use `max` for longest path searches).
+
+    Returns
+    -------
+    dict of {node : dict of {node : int}}
+        For each junction, the distance to each junction it has an edge
+        to in the compressed graph.
+
+    Notes
+    -----
+    Any node where a chain could branch (which can only happen with a
+    custom `is_junction`) is made a junction too. These are all found
+    before any chain is walked, so no edge of the compressed graph ever
+    passes through a junction.
+
+    Examples
+    --------
+    >>> # X branches when entered from C, so it must be a junction,
+    >>> # even though a chain from J1 to J2 could pass through it
+    >>> edges = {
+    ...     "J1": ["X"], "X": ["J1", "J2"], "J2": [],
+    ...     "J3": ["C"], "C": ["X"],
+    ... }
+    >>> graph = compress_graph(
+    ...     edges,
+    ...     edges.__getitem__,
+    ...     is_junction=lambda node: node.startswith("J"),
+    ... )
+    >>> graph["J1"], graph["J3"], graph["X"]
+    ({'X': 1}, {'X': 2}, {'J1': 1, 'J2': 1})
+    >>> longest_simple_path(graph, "J3", "J2")
+    3
+    """
+    def get_edges(node: Node) -> Iterable[tuple[Node, int]]:
+        if weighted:
+            return neighbors(node)
+        return ((next_node, 1) for next_node in neighbors(node))
+
+    # NOTE The edges out of each node are only found once; both passes
+    # below use the same edges, so they agree on where chains branch.
+    nodes = list(nodes)
+    out_edges: dict[Node, list[tuple[Node, int]]] = {}
+    next_nodes: dict[Node, list[Node]] = {}
+    prev_nodes: dict[Node, set[Node]] = defaultdict(set)
+    for node in nodes:
+        out_edges[node] = [
+            (next_node, distance)
+            for next_node, distance in get_edges(node)
+            if next_node != node
+        ]
+        next_nodes[node] = [next_node for next_node, _ in out_edges[node]]
+        for next_node in next_nodes[node]:
+            prev_nodes[next_node].add(node)
+
+    if is_junction is None:
+        junctions = {
+            node
+            for node in nodes
+            if len(set(next_nodes[node]) | prev_nodes[node]) != 2
+        }
+    else:
+        junctions = {node for node in nodes if is_junction(node)}
+    # NOTE A chain entering a node from any of its predecessors must
+    # have only one way onward; otherwise, the chain branches there, and
+    # the node has to be a junction.
+    junctions.update(
+        node
+        for node in nodes
+        if any(
+            sum(next_node != prev_node for next_node in next_nodes[node]) > 1
+            for prev_node in prev_nodes[node]
+        )
+    )
+
+    graph: WeightedGraph[Node] = {}
+    for junction in junctions:
+        edges = graph.setdefault(junction, {})
+        for current, distance in out_edges[junction]:
+            # Follow the chain from this junction until the next one
+            previous = junction
+            chain_nodes: set[Node] = set()
+            while current not in junctions:
+                # Get moves from here without doubling back
+                moves = [
+                    (next_node, next_distance)
+                    for next_node, next_distance in out_edges.get(
+                        current, ()
+                    )
+                    if next_node != previous
+                ]
+                # If the chain loops back on itself, or there are no
+                # moves, this is a dead end
+                if current in chain_nodes or not moves:
+                    break
+                # NOTE Any node with more than one move onward from a
+                # predecessor is a junction (see above), so there is
+                # only one move here.
+                chain_nodes.add(current)
+                previous, (current, step_distance) = current, moves[0]
+                distance += step_distance
+
+            # Dead ends (and chains back to the same junction) are
+            # dropped
+            if current not in junctions or current == junction:
+                continue
+            if current in edges:
+                distance = merge_parallel(edges[current], distance)
+            edges[current] = distance
+
+    return graph
+
+
+# NOTE Each entry of an adjacency list used by longest_simple_path is a
+# tuple of (next node index, next node bit, distance).
+type _Adjacency = list[list[tuple[int, int, int]]]
+# NOTE A task for a worker of longest_simple_path is a tuple of the
+# arguments to _longest_path_from.
+type _PathTask = tuple[
+    _Adjacency, list[int], list[int], int, int, int, int, int, int,
+]
+
+
+def _reachable_through(
+        neighbors: list[int],
+        max_through: list[int],
+        target: int,
+        node: int,
+        visited: int,
+) -> int:
+    """
+    Find the most the rest of a path could gain by passing through the
+    nodes it can still reach, by flood fill from its last node.
+
+    Returns
+    -------
+    int
+        Sum of `max_through` over every unvisited node that can be
+        reached from `node` without passing through a visited node or
+        the target, or -1 if the target can't be reached at all.
+    """
+    target_bit = 1 << target
+    reached = visited
+    frontier = 1 << node
+    through = -max_through[node]
+    while frontier:
+        node_bit = frontier & -frontier
+        frontier ^= node_bit
+        node = node_bit.bit_length() - 1
+        through += max_through[node]
+        new_nodes = neighbors[node] & ~reached
+        reached |= new_nodes
+        frontier |= new_nodes & ~target_bit
+    if not reached & target_bit:
+        return -1
+    return through
+
+
+def _longest_path_from(
+        adjacency: _Adjacency,
+        max_out: list[int],
+        max_through: list[int],
+        max_last: int,
+        target: int,
+        node: int,
+        visited: int,
+        distance: int,
+        remaining: int,
+        best: int = -1,
+) -> int:
+    """
+    Find the length of the longest simple path to the target, by
+    depth-first search from a partial path.
+
+    All distances are doubled (see `longest_simple_path`). A branch is
+    pruned once it can't beat the best path so far, even if it passed
+    through every unvisited node by its longest pair of edges; if that
+    doesn't prune it, it is also pruned once it can't beat the best path
+    by passing through every node it can still reach, or once it can't
+    reach the target at all.
+
+    Returns
+    -------
+    int
+        Doubled length of the longest path found that is longer than
+        `best`, or `best` if there is no such path.
+    """
+    neighbors = [
+        sum(next_bit for _, next_bit, _ in edges) for edges in adjacency
+    ]
+    # NOTE Each level of the search is an iterator over the edges out
+    # of its node, and the edges taken to reach each level are kept, so
+    # the search can step back by undoing them.
+    iterators = [iter(adjacency[node])]
+    path: list[tuple[int, int, int]] = []
+    while iterators:
+        for entry in iterators[-1]:
+            next_node, next_bit, weight = entry
+            if visited & next_bit:
+                continue
+            next_distance = distance + weight
+            if next_node == target:
+                if next_distance > best:
+                    best = next_distance
+                continue
+            next_remaining = remaining - max_through[next_node]
+            if (
+                next_distance + max_out[next_node] + next_remaining
+                + max_last <= best
+            ):
+                continue
+            through = _reachable_through(
+                neighbors, max_through, target, next_node,
+                visited | next_bit,
+            )
+            if (
+                through < 0
+                or next_distance + max_out[next_node] + through
+                + max_last <= best
+            ):
+                continue
+            # Step forward along this edge
+            visited |= next_bit
+            distance = next_distance
+            remaining = next_remaining
+            path.append(entry)
+            iterators.append(iter(adjacency[next_node]))
+            break
+        else:
+            # Step back along the last edge taken
+            iterators.pop()
+            if path:
+                last_node, last_bit, weight = path.pop()
+                visited ^= last_bit
+                distance -= weight
+                remaining += max_through[last_node]
+
+    return best
+
+
+def _longest_path_task(task: _PathTask) -> int:
+    return _longest_path_from(*task)
+
+
+def longest_simple_path[Node: Hashable](
+        graph: WeightedGraph[Node],
+        start: Node,
+        end: Node,
+        *,
+        split_depth: int = 0,
+        map_func: Callable[
+            [Callable[[Any], int], Iterable[Any]], Iterable[int]
+        ] = map,
+) -> int:
+    """
+    Find the length of the longest simple path (one that never visits a
+    node twice) from the start node to the end node.
+
+    This is an exhaustive depth-first search, so it is only feasible for
+    small graphs (e.g. ones made by `compress_graph`). Visited nodes are
+    kept as a bitmask, and branches that can't beat the longest path so
+    far are pruned. If the end node can only be entered from one node,
+    the search stops there, as the rest of the path is forced.
+
+    Parameters
+    ----------
+    graph : dict of {node : dict of {node : int}}
+        For each node, the distance to each node it has an edge to.
+        Distances must be non-negative, and nodes must be hashable.
+    start : node
+        Node at the start of the path.
+    end : node
+        Node at the end of the path.
+    split_depth : int, default 0
+        If positive, the search is split into one task per partial path
+        with this many edges, and the tasks are run with `map_func`.
+    map_func : callable, default `map`
+        Callable that applies a function to every item of an iterable,
+        like `map` (or `BaseSolution.parallel_map`, to run the tasks in
+        worker processes). Only used if `split_depth` is positive.
+
+    Returns
+    -------
+    int
+        Length of the longest simple path.
+
+    Raises
+    ------
+    NoPathError
+        If no path exists from the start node to the end node.
+
+    Notes
+    -----
+    The tasks don't share the longest path found so far, so each task
+    prunes less than a serial search would; splitting the search is only
+    worth it if the tasks really do run in parallel.
+
+    Before the search steps to a node, it finds which nodes can still
+    be reached from there; this costs time proportional to the number
+    of nodes, but prunes far more branches (including every one that has
+    walled off the end) than the visited nodes alone.
+    """
+    if start == end:
+        return 0
+
+    # Give each node an index (and a bit in the visited mask)
+    nodes = dict.fromkeys(graph)
+    for edges in graph.values():
+        nodes.update(dict.fromkeys(edges))
+    nodes.update(dict.fromkeys((start, end)))
+    index = {node: i for i, node in enumerate(nodes)}
+    # NOTE Distances are doubled, so that half of each edge can be
+    # counted towards each of its nodes without fractions.
+    outgoing: list[list[tuple[int, int]]] = [[] for _ in index]
+    incoming: list[list[tuple[int, int]]] = [[] for _ in index]
+    for node, edges in graph.items():
+        for next_node, weight in edges.items():
+            if next_node != node:
+                outgoing[index[node]].append((index[next_node], 2 * weight))
+                incoming[index[next_node]].append((index[node], 2 * weight))
+
+    # NOTE If the end can only be entered from one node, any path must
+    # go through that node last, so it's the real target of the search
+    # (and so on, if that node can only be entered from one node). The
+    # nodes after the target are marked visited, so the search never
+    # steps on them early.
+    start_index, target = index[start], index[end]
+    forced = forced_distance = 0
+    while target != start_index:
+        entries = [
+            (previous, weight)
+            for previous, weight in incoming[target]
+            if not forced >> previous & 1
+        ]
+        if len(entries) != 1 or entries[0][0] == start_index:
+            break
+        forced |= 1 << target
+        target, weight = entries[0]
+        forced_distance += weight
+
+    adjacency: _Adjacency = [
+        sorted(
+            (
+                (next_node, 1 << next_node, weight)
+                for next_node, weight in edges
+            ),
+            key=lambda entry: -entry[2],
+        )
+        for edges in outgoing
+    ]
+    # NOTE The rest of a path is made of an edge out of the current
+    # node, an edge into and out of each node it passes through, and an
+    # edge into the target. Half of each edge is counted for the node it
+    # leaves, and half for the node it enters; so the rest of the path
+    # can be no longer than the sum of the best (halved) edges out of
+    # the current node, into and out of every unvisited node, and into
+    # the target.
+    max_out = [
+        max((weight for _, weight in edges), default=0) // 2
+        for edges in outgoing
+    ]
+    max_through = [
+        max(
+            (
+                (in_weight + out_weight) // 2
+                for previous, in_weight in incoming[node]
+                for next_node, out_weight in outgoing[node]
+                if previous != next_node
+            ),
+            default=0,
+        )
+        for node in range(len(index))
+    ]
+    max_last = max((weight for _, weight in incoming[target]), default=0) // 2
+    visited = forced | 1 << start_index
+    remaining = sum(
+        weight
+        for node, weight in enumerate(max_through)
+        if not visited >> node & 1 and node != target
+    )
+
+    if split_depth <= 0:
+        best = _longest_path_from(
+            adjacency, max_out, max_through, max_last, target,
+            start_index, visited, 0, remaining,
+        )
+    else:
+        # Gather partial paths with split_depth edges (or fewer, if they
+        # reach the target early)
+        best = -1
+        tasks: list[_PathTask] = []
+        stack = [(start_index, visited, 0, remaining, 0)]
+        while stack:
+            node, visited, distance, remaining, depth = stack.pop()
+            if depth == split_depth:
+                tasks.append((
+                    adjacency, max_out, max_through, max_last, target,
+                    node, visited, distance, remaining,
+                ))
+                continue
+            for next_node, next_bit, weight in adjacency[node]:
+                if visited & next_bit:
+                    continue
+                if next_node == target:
+                    best = max(best, distance + weight)
+                    continue
+                stack.append((
+                    next_node,
+                    visited | next_bit,
+                    distance + weight,
+                    remaining - max_through[next_node],
+                    depth + 1,
+                ))
+        best = max(best, max(map_func(_longest_path_task, tasks), default=-1))
+
+    if best < 0:
+        raise NoPathError(f"no path exists from {start!r} to {end!r}")
+    return (best + forced_distance) // 2
+
+
+class IncrementalSearch[State: Hashable]:
+    """
+    Shortest path search between two states, which can be repeated
+    cheaply after states are blocked or unblocked.
+
+    This uses Lifelong Planning A* (LPA*). The distance to every state
+    explored so far is remembered between searches; after states are
+    blocked or unblocked, only the states whose distances could have
+    changed are explored again.
+    """
+
+    def __init__(
+            self,
+            start: State,
+            end: State,
+            *,
+            get_transitions: Callable[[State], Iterable[tuple[State, int]]],
+            get_reverse_transitions: (
+                Callable[[State], Iterable[tuple[State, int]]] | None
+            ) = None,
+            heuristic: Callable[[State], int] | None = None,
+            blocked: Iterable[State] = (),
+    ):
+        """
+        Set up a search from the start state to the end state. Nothing
+        is searched until a distance or path is asked for.
+
+        Parameters
+        ----------
+        start : state
+            State at the start of the path. States must be hashable.
+        end : state
+            State at the end of the path.
+        get_transitions : callable
+            Callable that takes a state as argument, and returns an
+            iterable of `(next_state, distance)` tuples. All distances
+            must be non-negative to ensure correct results.
+        get_reverse_transitions : callable, optional
+            Callable that takes a state as argument, and returns an
+            iterable of `(prev_state, distance)` tuples, one for each
+            transition from `prev_state` to the given state. If not
+            provided, transitions are assumed to be symmetric, and
+            `get_transitions` is used.
+        heuristic : callable, optional
+            Callable that takes a state as argument, and returns an
+            estimate of the distance from that state to the end state.
+            It must never overestimate the distance, and must be
+            consistent (as with `find_shortest_paths`). If not provided,
+            the estimate is always 0.
+        blocked : iterable of state, optional
+            States that are blocked from the start.
+        """
+        self.start, self.end = start, end
+        self.blocked: set[State] = set(blocked)
+        self._get_transitions = get_transitions
+        self._get_reverse_transitions = (
+            get_reverse_transitions
+            if get_reverse_transitions is not None
+            else get_transitions
+        )
+        self._heuristic = heuristic
+
+        # NOTE Each state has a distance found by the last search (g),
+        # and a distance from its predecessors' distances (rhs). A state
+        # is "inconsistent" if these differ, and only inconsistent
+        # states are in the queue. A missing entry means UNREACHED.
+        self._distances: dict[State, int] = {}
+        self._lookahead: dict[State, int] = {}
+        # NOTE Entries of the heap become stale when their state is
+        # updated; the current key of each queued state is kept here.
+        self._heap: list[tuple[int, int, int, State]] = []
+        self._queued: dict[State, tuple[int, int]] = {}
+        self._counter = count()
+        self._update(start)
+
+    def _key(self, state: State) -> tuple[int, int]:
+        distance = min(
+            self._distances.get(state, UNREACHED),
+            self._lookahead.get(state, UNREACHED),
+        )
+        if distance == UNREACHED:
+            return UNREACHED, UNREACHED
+        estimate = self._heuristic(state) if self._heuristic else 0
+        return distance + estimate, distance
+
+    def _update(self, state: State):
+        # Recalculate the distance from this state's predecessors
+        if state in self.blocked:
+            lookahead = UNREACHED
+        elif state == self.start:
+            lookahead = 0
+        else:
+            lookahead = min(
+                (
+                    prev_distance + distance
+                    for prev_state, distance
+                    in self._get_reverse_transitions(state)
+                    if prev_state not in self.blocked
+                    and (
+                        prev_distance := self._distances.get(
+                            prev_state, UNREACHED,
+                        )
+                    ) != UNREACHED
+                ),
+                default=UNREACHED,
+            )
+        if lookahead == UNREACHED:
+            self._lookahead.pop(state, None)
+        else:
+            self._lookahead[state] = lookahead
+
+        # Queue this state only if it is inconsistent
+        if self._distances.get(state, UNREACHED) != lookahead:
+            key = self._key(state)
+            self._queued[state] = key
+            heappush(self._heap, (*key, next(self._counter), state))
+        else:
+            self._queued.pop(state, None)
+
+    def _search(self):
+        heap, queued = self._heap, self._queued
+        distances, lookahead = self._distances, self._lookahead
+        end = self.end
+        while heap:
+            priority, distance, _, state = heap[0]
+            # Skip stale entries
+            if queued.get(state) != (priority, distance):
+                heappop(heap)
+                continue
+            # Stop once the end state is consistent, and no queued state
+            # could give it a shorter distance
+            if (
+                (priority, distance) >= self._key(end)
+                and distances.get(end, UNREACHED)
+                == lookahead.get(end, UNREACHED)
+            ):
+                break
+            heappop(heap)
+            del queued[state]
+
+            state_lookahead = lookahead.get(state, UNREACHED)
+            if distances.get(state, UNREACHED) > state_lookahead:
+                # This state got closer; settle its new distance
+                distances[state] = state_lookahead
+            else:
+                # This state got farther; unsettle it, and look at it
+                # again later
+                distances.pop(state, None)
+                self._update(state)
+            for next_state, _ in self._get_transitions(state):
+                self._update(next_state)
+
+    def block(self, state: State):
+        """
+        Block a state, so that paths can't go through it.
+
+        Parameters
+        ----------
+        state : state
+            State to block. Nothing happens if it is already blocked.
+        """
+        if state in self.blocked:
+            return
+        self.blocked.add(state)
+        self._update(state)
+        for next_state, _ in self._get_transitions(state):
+            self._update(next_state)
+
+    def unblock(self, state: State):
+        """
+        Unblock a state, so that paths can go through it again.
+
+        Parameters
+        ----------
+        state : state
+            State to unblock. Nothing happens if it isn't blocked.
+        """
+        if state not in self.blocked:
+            return
+        self.blocked.remove(state)
+        self._update(state)
+        for next_state, _ in self._get_transitions(state):
+            self._update(next_state)
+
+    def find_distance(self) -> int:
+        """
+        Find the distance of the shortest path from the start state to
+        the end state, with the states that are currently blocked.
+
+        Returns
+        -------
+        int
+            Distance of the shortest path.
+
+        Raises
+        ------
+        NoPathError
+            If no path exists from the start state to the end state.
+        """
+        self._search()
+        distance = self._distances.get(self.end, UNREACHED)
+        if distance == UNREACHED:
+            raise NoPathError(
+                f"no path exists from {self.start!r} to {self.end!r}"
+            )
+        return distance
+
+    def find_path(self) -> list[State]:
+        """
+        Find a shortest path from the start state to the end state, with
+        the states that are currently blocked.
+
+        Returns
+        -------
+        list of state
+            States along the path, from the start state to the end
+            state.
+
+        Raises
+        ------
+        NoPathError
+            If no path exists from the start state to the end state.
+        """
+        self.find_distance()
+        distances = self._distances
+        # Walk back from the end along predecessors that agree with the
+        # distances
+        path = [self.end]
+        while (state := path[-1]) != self.start:
+            path.append(next(
+                prev_state
+                for prev_state, distance
+                in self._get_reverse_transitions(state)
+                if prev_state not in self.blocked
+                and distances.get(prev_state, UNREACHED) + distance
+                == distances[state]
+            ))
+        path.reverse()
+        return path
+
+
+class UnionFind[T]:
+    """
+    A disjoint set ("union-find") data structure.
+
+    Disjoint sets are stored in the form of a forest of trees. The root
+    of each tree is the "representative" of that set; two items with the
+    same representative are in the same set. This allows for efficient
+    `union` and `find` operations in nearly O(1) amortized time.
+    """
+
+    def __init__(self, items: Iterable[T]):
+        """
+        Create a new union-find structure with each item in its own set.
+
+        Parameters
+        ----------
+        items : iterable
+            The items to be stored in the union-find structure.
+        """
+        items_list = list(items)
+        # NOTE An item is "its own parent" if and only if it is a root.
+        self.parent = {item: item for item in items_list}
+        # Track the size of each tree at its root
+        self.size = {item: 1 for item in items_list}
+
+    def find(self, item: T) -> T:
+        """
+        Find the "representative" (root of the corresponding tree) of
+        the set containing `item`.
+
+        Path compression is used to flatten the structure of the tree,
+        which makes future `find` operations faster.
+
+        Parameters
+        ----------
+        item : item
+            The item to find the representative for.
+
+        Returns
+        -------
+        item
+            The representative of the set containing `item`.
+        """
+        # Compress the path to the root
+        if self.parent[item] != item:
+            self.parent[item] = self.find(self.parent[item])
+        # Now the item's "parent" will be the root of its set
+        return self.parent[item]
+
+    def union(self, item1: T, item2: T):
+        """
+        Merge the sets containing `item1` and `item2`.
+
+        Parameters
+        ----------
+        item1 : item
+            An item from the first set.
+        item2 : item
+            An item from the second set.
+        """
+        # Find the roots of both sets
+        root1, root2 = self.find(item1), self.find(item2)
+        # Do nothing if both sets are already the same
+        if root1 == root2:
+            return
+
+        # Ensure root1 is the one with more descendants
+        # NOTE This merging strategy is called "union by size", and it
+        # helps keep the tree height low.
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        # Make root1 the new root and update its stored size
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        # root2 is no longer a root, so it shouldn't store a size
+        del self.size[root2]
+
+    @property
+    def set_sizes(self) -> list[int]:
+        """
+        Get the sizes of all sets. They are returned in an arbitrary
+        order.
+
+        Returns
+        -------
+        list of int
+            The sizes of all sets.
+        """
+        return list(self.size.values())
+
+
+def find_disconnecting_block[State: Hashable](
+        states: Iterable[State],
+        blocks: Sequence[State],
+        start: State,
+        end: State,
+        *,
+        get_neighbors: Callable[[State], Iterable[State]],
+) -> int | None:
+    """
+    Find the first of a sequence of blocked states that disconnects the
+    start state from the end state.
+
+    Instead of searching again after each state is blocked, this works
+    backward: every state is blocked, then they are unblocked in reverse
+    order (merging each one with its unblocked neighbors in a union-find
+    structure) until the start and end are connected. This takes nearly
+    linear time overall.
+
+    Parameters
+    ----------
+    states : iterable of state
+        Every state of the graph (blocked or not). States must be
+        hashable.
+    blocks : sequence of state
+        States that are blocked, in order. Once a state is blocked, it
+        stays blocked.
+    start : state
+        State at the start of the path.
+    end : state
+        State at the end of the path.
+    get_neighbors : callable
+        Callable that takes a state as argument, and returns an iterable
+        of the states it is connected to. Connections are assumed to be
+        symmetric (as with moves between cells of a grid).
+
+    Returns
+    -------
+    int or None
+        Index in `blocks` of the state that disconnects the start and
+        end, or None if they are still connected after every block.
+
+    Raises
+    ------
+    NoPathError
+        If the start and end are not connected even with nothing
+        blocked.
+    """
+    states_list = list(states)
+    # NOTE If a state is blocked more than once, only the first time
+    # matters.
+    first_blocked: dict[State, int] = {}
+    for i, state in enumerate(blocks):
+        first_blocked.setdefault(state, i)
+
+    uf = UnionFind(states_list)
+    unblocked: set[State] = set()
+
+    def unblock(state: State):
+        unblocked.add(state)
+        for neighbor in get_neighbors(state):
+            if neighbor in unblocked:
+                uf.union(state, neighbor)
+
+    def connected() -> bool:
+        return (
+            start in unblocked
+            and end in unblocked
+            and uf.find(start) == uf.find(end)
+        )
+
+    for state in states_list:
+        if state not in first_blocked:
+            unblock(state)
+    if connected():
+        return None
+
+    # Unblock states in reverse order, until the start and end connect
+    for i in reversed(range(len(blocks))):
+        state = blocks[i]
+        if first_blocked[state] != i:
+            continue
+        unblock(state)
+        if connected():
+            return i
+
+    raise NoPathError(f"no path exists from {start!r} to {end!r}")
+
+
+@dataclass(frozen=True)
+class Reachability[State: Hashable, Node: Hashable]:
+    """
+    Result of `reachability_from_all`.
+
+    Attributes
+    ----------
+    components : dict of {state : int}
+        Index of the strongly connected component of each state.
+        Components are numbered in reverse topological order, so every
+        component a state can reach has an index no higher than its
+        own.
+    bitsets : list of int
+        Nodes reachable from each component, as a bitset (bit `i` is set
+        if `nodes[i]` is reachable).
+    nodes : list of node
+        Node of each bit of the bitsets.
+    """
+    components: dict[State, int]
+    bitsets: list[int]
+    nodes: list[Node]
+
+    def __contains__(self, state: State) -> bool:
+        return state in self.components
+
+    def bitset_from(self, *states: State) -> int:
+        """
+        Get the nodes reachable from any of some states, as a bitset.
+
+        Parameters
+        ----------
+        *states : state
+            States to start from. Each must have been reached.
+
+        Returns
+        -------
+        int
+            Bitset of the reachable nodes (see `nodes`).
+        """
+        bitset = 0
+        for state in states:
+            bitset |= self.bitsets[self.components[state]]
+        return bitset
+
+    def count_from(self, *states: State) -> int:
+        """
+        Count the nodes reachable from any of some states.
+
+        Parameters
+        ----------
+        *states : state
+            States to start from. Each must have been reached.
+
+        Returns
+        -------
+        int
+            Number of reachable nodes.
+        """
+        return self.bitset_from(*states).bit_count()
+
+    def nodes_from(self, *states: State) -> set[Node]:
+        """
+        Find the nodes reachable from any of some states.
+
+        Parameters
+        ----------
+        *states : state
+            States to start from. Each must have been reached.
+
+        Returns
+        -------
+        set of node
+            All reachable nodes.
+        """
+        bitset = self.bitset_from(*states)
+        return {node for i, node in enumerate(self.nodes) if bitset >> i & 1}
+
+
+@overload
+def reachability_from_all[State: Hashable](
+        states: Iterable[State],
+        next_states: Callable[[State], Iterable[State]],
+) -> Reachability[State, State]: ...
+@overload
+def reachability_from_all[State: Hashable, Node: Hashable](
+        states: Iterable[State],
+        next_states: Callable[[State], Iterable[State]],
+        *,
+        get_node: Callable[[State], Node],
+) -> Reachability[State, Node]: ...
+def reachability_from_all[State: Hashable, Node: Hashable](
+        states: Iterable[State],
+        next_states: Callable[[State], Iterable[State]],
+        *,
+        get_node: Callable[[State], Any] | None = None,
+) -> Reachability[State, Any]:
+    """
+    Find the nodes reachable from every state reachable from some
+    starting states, all at once.
+
+    The state graph is explored once, and condensed into its strongly
+    connected components (states that can all reach each other) with
+    Tarjan's algorithm. The components are found in reverse topological
+    order, so the nodes reachable from each one can be found as a bitset
+    by combining the bitsets of the components it leads to. Afterward,
+    the nodes reachable from any state are just a few bitwise ORs away,
+    instead of a whole new search.
+
+    Parameters
+    ----------
+    states : iterable of state
+        States to start exploring from. States must be hashable.
+    next_states : callable
+        Callable that takes a state as argument, and returns an iterable
+        of next states.
+    get_node : callable, optional
+        Callable that takes a state as argument, and returns its node
+        (e.g. the point of a position). Nodes must be hashable. If not
+        provided, each state is its own node.
+
+    Returns
+    -------
+    Reachability
+        Contains:
+            - components: the component index of each reached state
+            - bitsets: the nodes reachable from each component
+            - nodes: the node of each bit of the bitsets
+
+    Notes
+    -----
+    Each bitset can have a bit for every node, so this can take a lot of
+    memory if there are many components and many nodes.
+    """
+    node_bits: dict[Any, int] = {}
+    state_bits: dict[State, int] = {}
+    successors: dict[State, list[State]] = {}
+    # NOTE A state's index is the order it was first reached in, and its
+    # lowlink is the lowest index it is known to reach (while it is
+    # still on the Tarjan stack).
+    indices: dict[State, int] = {}
+    lowlinks: dict[State, int] = {}
+    tarjan_stack: list[State] = []
+    components: dict[State, int] = {}
+    bitsets: list[int] = []
+
+    def visit(state: State) -> Iterator[State]:
+        indices[state] = lowlinks[state] = len(indices)
+        tarjan_stack.append(state)
+        node = state if get_node is None else get_node(state)
+        if (bit := node_bits.get(node)) is None:
+            bit = node_bits[node] = 1 << len(node_bits)
+        state_bits[state] = bit
+        successors[state] = list(next_states(state))
+        return iter(successors[state])
+
+    for root in states:
+        if root in indices:
+            continue
+
+        # NOTE This is Tarjan's algorithm, made iterative with a stack
+        # of states and iterators over their next states.
+        work: list[tuple[State, Iterator[State]]] = [(root, visit(root))]
+        while work:
+            state, next_iter = work[-1]
+            for next_state in next_iter:
+                if next_state not in indices:
+                    work.append((next_state, visit(next_state)))
+                    break
+                # A state that isn't in a component yet is on the stack
+                if next_state not in components:
+                    lowlinks[state] = min(
+                        lowlinks[state], indices[next_state],
+                    )
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[state])
+                if lowlinks[state] != indices[state]:
+                    continue
+
+                # This state is the root of a component; pop it off
+                component = len(bitsets)
+                members: list[State] = []
+                while True:
+                    member = tarjan_stack.pop()
+                    components[member] = component
+                    members.append(member)
+                    if member == state:
+                        break
+                # NOTE Every other component this one leads to was
+                # already found, so its bitset is complete.
+                bitset = 0
+                for member in members:
+                    bitset |= state_bits[member]
+                    for next_state in successors[member]:
+                        next_component = components[next_state]
+                        if next_component != component:
+                            bitset |= bitsets[next_component]
+                bitsets.append(bitset)
+                for member in members:
+                    del successors[member]
+
+    return Reachability(
+        components=components,
+        bitsets=bitsets,
+        nodes=list(node_bits),
     )
 
 
@@ -264,6 +2533,7 @@ def find_reachable_nodes[Node, State: PathState[Node]](  # pyright: ignore[repor
         *,
         get_next_states: Callable[[State], Iterable[State]],
         max_distance: int | None = None,
+        collect_stats: bool | None = None,
 ) -> set[Node]:  # pyright: ignore[reportInvalidTypeVarUse]
     """
     Find all nodes reachable from the starting states.
@@ -285,6 +2555,11 @@ def find_reachable_nodes[Node, State: PathState[Node]](  # pyright: ignore[repor
         Maximum distance from any start state. If provided, only nodes
         within this distance are included. All state transitions are
         unweighted, i.e. the distance between any two states is 1.
+    collect_stats : bool, optional
+        Whether to collect stats about the search (see `SearchStats`).
+        By default, they are only collected inside a
+        `collect_search_stats()` block. As only the set of nodes is
+        returned, the stats can only be seen through that block.
 
     Returns
     -------
@@ -302,6 +2577,9 @@ def find_reachable_nodes[Node, State: PathState[Node]](  # pyright: ignore[repor
     for state in start_states_list:
         visited.add(state)
         reachable.add(state.node)
+    stats = _new_stats("find_reachable_nodes", collect_stats)
+    start_time = perf_counter_ns()
+    num_expanded = num_relaxed = 0
 
     while queue:
         distance, state = queue.popleft()
@@ -310,20 +2588,43 @@ def find_reachable_nodes[Node, State: PathState[Node]](  # pyright: ignore[repor
         if max_distance is not None and distance >= max_distance:
             continue
 
+        num_expanded += 1
         for next_state in get_next_states(state):
+            num_relaxed += 1
             if next_state not in visited:
                 visited.add(next_state)
                 reachable.add(next_state.node)
                 queue.append((distance + 1, next_state))
+                if stats is not None:
+                    _update_peaks(stats, len(queue), 0)
 
+    if stats is not None:
+        _finish_stats(stats, start_time, num_expanded, num_relaxed, 0)
     return reachable
 
 
 __all__ = [
+    "DistanceField",
+    "IncrementalSearch",
+    "IndexedPathResult",
     "NoPathError",
     "PathResult",
     "PathState",
+    "QueueKind",
+    "Reachability",
+    "SearchStats",
+    "UNREACHED",
+    "UnionFind",
+    "WeightedGraph",
+    "collect_search_stats",
+    "compress_graph",
+    "distance_field",
+    "find_disconnecting_block",
     "find_reachable_nodes",
     "find_shortest_paths",
+    "find_shortest_paths_bidirectional",
+    "find_shortest_paths_indexed",
+    "longest_simple_path",
+    "reachability_from_all",
     "taxicab_distance",
 ]